@@ -1,11 +1,23 @@
+import hashlib
+import os
+import uuid
+from collections import OrderedDict
 import numpy as np
 import tensorflow as tf
+from scipy.spatial import cKDTree
+from common_utilities.compiled import FOLLOW, CompiledFunction
 from common_utilities.instance import tf2np
 from tensorflow_graphics.geometry.representation.mesh.normals import \
     face_normals, vertex_normals
+from common_utilities.profiling import profile
 
 
-def compute_barycentric_coords(verts, triangles, n_samples):
+SAMPLING_MODES = ("uniform", "farthest", "poisson")
+
+
+@profile
+def compute_barycentric_coords(verts, triangles, n_samples, dtype=None,
+                               mode="uniform", oversampling=5, seed=None):
     """Computes barycentric coordinates and corresponding triangle indices for
     mesh sampling.
 
@@ -17,6 +29,19 @@ def compute_barycentric_coords(verts, triangles, n_samples):
         Indices of vertices that make up the triangle.
     n_samples : int
         Number of samples on mesh surface.
+    dtype : np.dtype
+        dtype of `coords`. Defaults to dtype of `verts` if floating point,
+        else float32.
+    mode : string
+        "uniform" samples randomly proportional to triangle area.
+        "farthest" runs farthest point sampling and "poisson" runs Poisson
+        disk sample elimination on uniform candidates, giving even coverage.
+    oversampling : int
+        Number of uniform candidates per sample for "farthest" and
+        "poisson" modes.
+    seed : int
+        Seed for reproducible samples. Uses global numpy random state if
+        None.
 
     Returns
     -------
@@ -25,16 +50,43 @@ def compute_barycentric_coords(verts, triangles, n_samples):
     ids_triangle : np.ndarray of shape (n_samples, )
         Index of triangle for each sampled point.
     """
+    assert mode in SAMPLING_MODES, "Unknown sampling mode."
+    rng = np.random if seed is None else np.random.RandomState(seed)
 
-    verts = tf2np(verts)
-    triangles = tf2np(triangles)
+    verts, triangles = tf2np((verts, triangles))
+    verts = np.asarray(verts)
+    if dtype is None:
+        dtype = verts.dtype \
+            if np.issubdtype(verts.dtype, np.floating) else np.float32
 
-    # compute area of each triangle and normalize
+    # compute area of each triangle; in float64 so that low precision
+    # vertices do not distort sampling density
+    verts = verts.astype(np.float64)
     cross = np.cross(
         verts[triangles[:, 0], :] - verts[triangles[:, 2], :],
         verts[triangles[:, 1], :] - verts[triangles[:, 2], :],
     )
     area_triangles = 1/2 * np.linalg.norm(cross, axis=1)
+
+    if mode == "uniform":
+        return _sample_uniform(area_triangles, n_samples, dtype, rng)
+
+    # select evenly spread subset of dense uniform candidates
+    coords, ids_triangle = _sample_uniform(
+        area_triangles, oversampling * n_samples, np.float64, rng)
+    pts = _interpolate(verts, triangles, coords, ids_triangle)
+    if mode == "farthest":
+        ids_keep = _farthest_point_sampling(pts, n_samples, rng)
+    else:
+        ids_keep = _poisson_disk_elimination(
+            pts, n_samples, np.sum(area_triangles), rng)
+    ids_keep = np.sort(ids_keep)
+
+    return coords[ids_keep].astype(dtype), ids_triangle[ids_keep]
+
+
+def _sample_uniform(area_triangles, n_samples, dtype, rng=np.random):
+    """Samples barycentric coordinates proportional to triangle area."""
     area_normalized = area_triangles / np.sum(area_triangles)
 
     # sample points based on area
@@ -43,36 +95,267 @@ def compute_barycentric_coords(verts, triangles, n_samples):
     n_extra = np.sum(n_samples_per_triangle) - n_samples
     if n_extra > 0:
         ids = np.nonzero(n_samples_per_triangle)[0]
-        ids_extra = np.random.choice(ids, n_extra, replace=False)
+        ids_extra = rng.choice(ids, n_extra, replace=False)
         n_samples_per_triangle[ids_extra] -= 1
     n_samples = np.sum(n_samples_per_triangle)
 
     # map samples to triangle indices
-    ids_triangle = np.zeros([n_samples, ], dtype=np.int32)
-    count_samples = 0
-    for idx_triangle, n_samples_this_triangle in \
-            enumerate(n_samples_per_triangle):
-        ids_triangle[
-            count_samples:
-            count_samples + n_samples_this_triangle] = idx_triangle
-        count_samples += n_samples_this_triangle
+    ids_triangle = np.repeat(
+        np.arange(len(area_triangles), dtype=np.int32),
+        n_samples_per_triangle)
 
     # randomly generate barycentric coordinates
-    coords = np.random.rand(n_samples, 2).astype(np.float32)
+    coords = rng.rand(n_samples, 2).astype(dtype)
 
     return coords, ids_triangle
 
 
+def _interpolate(verts, triangles, coords, ids_triangle):
+    """NumPy version of `dense_sample`."""
+    corners = verts[triangles[ids_triangle]]
+    sqrt_r1 = np.sqrt(coords[:, 0:1])
+    r2 = coords[:, 1:]
+
+    return (1 - sqrt_r1) * corners[:, 0] \
+        + sqrt_r1 * (1 - r2) * corners[:, 1] \
+        + sqrt_r1 * r2 * corners[:, 2]
+
+
+def _farthest_point_sampling(pts, n_samples, rng=np.random,
+                             block_size=1024):
+    """Returns indices of `n_samples` points chosen by farthest point sampling.
+
+    A selected point can only reduce distances of points closer than the
+    current farthest distance, so only those are updated using a KD-tree.
+    The farthest point is found from the maximum distance of each block of
+    `block_size` points, recomputed only for blocks with updated points.
+    """
+    n_pts = len(pts)
+    tree = cKDTree(pts)
+    n_blocks = -(-n_pts // block_size)
+    # padding has negative distance so it is never selected
+    dists = np.full(n_blocks * block_size, -1.0)
+    dists[:n_pts] = np.inf
+    dists_blocks = dists.reshape(n_blocks, block_size)
+    max_blocks = np.full(n_blocks, np.inf)
+    ids_selected = np.empty(n_samples, dtype=np.int64)
+
+    idx = rng.randint(n_pts)
+    radius = np.inf
+    for count in range(n_samples):
+        ids_selected[count] = idx
+        if np.isinf(radius):
+            ids_near = np.arange(n_pts)
+        else:
+            ids_near = np.asarray(
+                tree.query_ball_point(pts[idx], radius), dtype=np.int64)
+        dists_near = np.linalg.norm(pts[ids_near] - pts[idx], axis=1)
+        dists[ids_near] = np.minimum(dists[ids_near], dists_near)
+
+        blocks = np.unique(ids_near // block_size)
+        max_blocks[blocks] = dists_blocks[blocks].max(axis=1)
+        block = np.argmax(max_blocks)
+        radius = max_blocks[block]
+        if radius <= 0:
+            # fewer distinct points than requested samples
+            return ids_selected[:count + 1]
+        idx = block * block_size + np.argmax(dists_blocks[block])
+
+    return ids_selected
+
+
+def _poisson_disk_elimination(pts, n_samples, area, rng=np.random):
+    """Returns indices of `n_samples` points kept by weighted sample
+    elimination (Yuksel, 2015) for Poisson disk distribution on a surface.
+
+    Instead of removing the single heaviest point at a time, every round
+    removes all heavy points that outweigh their remaining neighbours at
+    once. This is vectorized and gives spacing close to the sequential
+    algorithm in a few dozen rounds.
+
+    Arguments
+    ---------
+    pts : np.ndarray of shape (n_candidates, 3)
+        Candidate points on surface.
+    n_samples : int
+        Number of points to keep.
+    area : float
+        Total surface area, defines Poisson disk radius.
+    """
+    n_pts = len(pts)
+    radius = 2 * np.sqrt(area / (2 * np.sqrt(3) * n_samples))
+
+    # weight of each neighbour pair within radius, in both directions
+    pairs = cKDTree(pts).query_pairs(radius, output_type="ndarray")
+    dists = np.linalg.norm(pts[pairs[:, 0]] - pts[pairs[:, 1]], axis=1)
+    weights_pair = (1 - dists / radius) ** 8
+    ids_from = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    ids_to = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    weights_pair = np.concatenate([weights_pair, weights_pair])
+    weights = np.bincount(ids_from, weights_pair, minlength=n_pts)
+
+    alive = np.ones(n_pts, dtype=bool)
+    n_remove = n_pts - n_samples
+    while n_remove > 0:
+        # local maxima of weight, ties broken by index
+        beaten = (weights[ids_to] > weights[ids_from]) | (
+            (weights[ids_to] == weights[ids_from]) & (ids_to > ids_from))
+        is_max = alive.copy()
+        is_max[ids_from[beaten]] = False
+        # only heavy maxima, so that sparse regions are not thinned before
+        # dense ones as in sequential elimination
+        weight_min = 0.5 * np.max(weights[alive])
+        ids_remove = np.nonzero(
+            is_max & (weights > 0) & (weights >= weight_min))[0]
+        if len(ids_remove) == 0:
+            # no overlapping disks left, remove any remaining points
+            ids_remove = rng.choice(
+                np.nonzero(alive)[0], n_remove, replace=False)
+        elif len(ids_remove) > n_remove:
+            ids_remove = ids_remove[
+                np.argsort(-weights[ids_remove])[:n_remove]]
+        alive[ids_remove] = False
+        n_remove -= len(ids_remove)
+
+        # remove weight contributed by eliminated points, drop their pairs
+        removed_to = ~alive[ids_to]
+        weights -= np.bincount(ids_from[removed_to], weights_pair[removed_to],
+                               minlength=n_pts)
+        keep = alive[ids_from] & ~removed_to
+        ids_from, ids_to = ids_from[keep], ids_to[keep]
+        weights_pair = weights_pair[keep]
+
+    return np.nonzero(alive)[0]
+
+
+def topology_hash(triangles):
+    """Returns hex digest identifying mesh topology."""
+    triangles = np.ascontiguousarray(tf2np(triangles), dtype=np.int64)
+    digest = hashlib.sha1(triangles.tobytes())
+    digest.update(str(triangles.shape).encode())
+
+    return digest.hexdigest()[:16]
+
+
+class BarycentricCache:
+    """LRU cache of barycentric sample sets for reuse across epochs.
+
+    Samples are keyed by (topology hash, n_samples, seed, mode) and stored
+    compactly as float16 coords and int32 triangle ids. Areas are taken from
+    `verts` of the first call for a key, so the cache suits meshes whose
+    shape changes little relative to the sampling density.
+
+    If `cache_dir` is given, samples are also saved there as .npy files and
+    loaded memory-mapped, so worker processes using the same directory
+    share them through the page cache instead of copying.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Number of lookups served from memory or disk, and computed anew.
+    """
+
+    def __init__(self, max_entries=16, cache_dir=None):
+        """Creates empty cache.
+
+        Arguments
+        ---------
+        max_entries : int
+            Number of sample sets kept in memory.
+        cache_dir : string
+            Directory for persisting sample sets. Not persisted if None.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, verts, triangles, n_samples, seed=0, mode="uniform"):
+        """Returns cached samples, computing them on first use.
+
+        Arguments are as for `compute_barycentric_coords`.
+
+        Returns
+        -------
+        coords : np.ndarray of shape (n_samples, 2) and dtype float16
+            Barycentric coordinates for each sampled point. Read only.
+        ids_triangle : np.ndarray of shape (n_samples, ) and dtype int32
+            Index of triangle for each sampled point. Read only.
+        """
+        key = "{}_{}_{}_{}".format(
+            topology_hash(triangles), n_samples, seed, mode)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        entry = self._load(key)
+        if entry is None:
+            self.misses += 1
+            coords, ids_triangle = compute_barycentric_coords(
+                verts, triangles, n_samples, mode=mode, seed=seed)
+            entry = self._store(key, coords.astype(np.float16),
+                                ids_triangle.astype(np.int32))
+        else:
+            self.hits += 1
+
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    def clear(self):
+        """Drops in-memory entries. Files in `cache_dir` are kept."""
+        self._entries.clear()
+
+    def _paths(self, key):
+        return [os.path.join(self.cache_dir, "{}_{}.npy".format(key, name))
+                for name in ["ids", "coords"]]
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+
+        path_ids, path_coords = self._paths(key)
+        # coords are written last, so their presence implies both exist
+        if not os.path.exists(path_coords):
+            return None
+
+        return np.load(path_coords, mmap_mode="r"), \
+            np.load(path_ids, mmap_mode="r")
+
+    def _store(self, key, coords, ids_triangle):
+        for array in [coords, ids_triangle]:
+            array.flags.writeable = False
+        if self.cache_dir is None:
+            return coords, ids_triangle
+
+        # write to temporary file and rename, so that concurrent workers
+        # never see partial files
+        for path, array in zip(self._paths(key), [ids_triangle, coords]):
+            path_tmp = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+            with open(path_tmp, "wb") as file:
+                np.save(file, array)
+            os.replace(path_tmp, path)
+
+        return self._load(key)
+
+
+@profile
 def dense_sample(verts, triangles, barycentric_coords, barycentric_triangles):
-    corner1_vertices = tf.gather(
-        verts, triangles[barycentric_triangles, 0]
-    )
-    corner2_vertices = tf.gather(
-        verts, triangles[barycentric_triangles, 1]
-    )
-    corner3_vertices = tf.gather(
-        verts, triangles[barycentric_triangles, 2]
-    )
+    verts = tf.convert_to_tensor(verts)
+    barycentric_coords = tf.cast(barycentric_coords, verts.dtype)
+
+    # gather instead of fancy indexing so that triangles may be a tensor
+    corners = tf.gather(triangles, barycentric_triangles)
+    corner1_vertices = tf.gather(verts, corners[:, 0])
+    corner2_vertices = tf.gather(verts, corners[:, 1])
+    corner3_vertices = tf.gather(verts, corners[:, 2])
 
     samples = (1 - tf.sqrt(barycentric_coords[:, 0:1])) \
         * corner1_vertices \
@@ -84,18 +367,17 @@ def dense_sample(verts, triangles, barycentric_coords, barycentric_triangles):
     return samples
 
 
+@profile
 def get_normals_at_samples(verts, triangles,
                            barycentric_coords, barycentric_triangles):
+    verts = tf.convert_to_tensor(verts)
+    barycentric_coords = tf.cast(barycentric_coords, verts.dtype)
+
     normals_at_verts = vertex_normals(verts, triangles)
-    corner1_normals = tf.gather(
-        normals_at_verts, triangles[barycentric_triangles, 0]
-    )
-    corner2_normals = tf.gather(
-        normals_at_verts, triangles[barycentric_triangles, 1]
-    )
-    corner3_normals = tf.gather(
-        normals_at_verts, triangles[barycentric_triangles, 2]
-    )
+    corners = tf.gather(triangles, barycentric_triangles)
+    corner1_normals = tf.gather(normals_at_verts, corners[:, 0])
+    corner2_normals = tf.gather(normals_at_verts, corners[:, 1])
+    corner3_normals = tf.gather(normals_at_verts, corners[:, 2])
     normals_at_samples = (1 - tf.sqrt(barycentric_coords[:, 0:1])) \
         * corner1_normals \
         + tf.sqrt(barycentric_coords[:, 0:1]) *\
@@ -104,3 +386,13 @@ def get_normals_at_samples(verts, triangles,
         barycentric_coords[:, 1:] * corner3_normals
 
     return normals_at_samples
+
+
+# compiled versions, traced once per dtype for any mesh and sample count
+_SAMPLE_SPECS = [
+    ([None, 3], FOLLOW), ([None, 3], tf.int32),
+    ([None, 2], FOLLOW), ([None], tf.int32),
+]
+dense_sample_compiled = CompiledFunction(dense_sample, _SAMPLE_SPECS)
+get_normals_at_samples_compiled = CompiledFunction(
+    get_normals_at_samples, _SAMPLE_SPECS)
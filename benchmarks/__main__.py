@@ -0,0 +1,56 @@
+"""Runs benchmark suite on CPU.
+
+Usage
+-----
+python -m common_utilities.benchmarks --output results.json
+python -m common_utilities.benchmarks --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import importlib
+import os
+import sys
+
+# hide GPUs before tensorflow is imported by benchmark modules
+os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+
+MODULES = [
+    "bench_barycentric",
+    "bench_camera",
+    "bench_transformation",
+    "bench_tf_proto",
+    "bench_o3d_wrapper",
+    "bench_mpl_plot",
+    "bench_point_mesh_distance",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--output", help="path to store results as JSON")
+    parser.add_argument("--baseline", help="path of saved baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown against baseline")
+    parser.add_argument("--filter", dest="pattern",
+                        help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of timed calls per benchmark")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        importlib.import_module("." + module, __package__)
+    from .harness import compare, load, run, save
+
+    results = run(args.pattern, args.repeat)
+    if args.output is not None:
+        save(results, args.output)
+
+    if args.baseline is not None:
+        regressions = compare(results, load(args.baseline), args.tolerance)
+        for name, ratio in sorted(regressions.items()):
+            print("REGRESSION {:<60} {:>6.2f}x".format(name, ratio))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
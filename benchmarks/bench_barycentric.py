@@ -0,0 +1,24 @@
+import numpy as np
+from common_utilities.barycentric_mesh_sampling import \
+    compute_barycentric_coords, dense_sample
+from .harness import benchmark, grid_mesh
+
+
+@benchmark(n_faces=[1000, 10000, 100000], n_samples=[1000, 10000])
+def bench_compute_barycentric_coords(n_faces, n_samples):
+    verts, triangles = grid_mesh(n_faces)
+    return lambda: compute_barycentric_coords(verts, triangles, n_samples)
+
+
+@benchmark(n_faces=[1000, 100000], n_samples=[1000, 100000])
+def bench_dense_sample(n_faces, n_samples):
+    verts, triangles = grid_mesh(n_faces)
+    coords, ids = compute_barycentric_coords(verts, triangles, n_samples)
+    return lambda: np.asarray(dense_sample(verts, triangles, coords, ids))
+
+
+@benchmark(mode=["farthest", "poisson"], n_samples=[10000, 100000])
+def bench_blue_noise_sampling(mode, n_samples):
+    verts, triangles = grid_mesh(100000)
+    return lambda: compute_barycentric_coords(
+        verts, triangles, n_samples, mode=mode)
@@ -0,0 +1,33 @@
+import tensorflow as tf
+from common_utilities.camera_image_frame import depth_to_xyz, xyz_to_uvd, \
+    depth_to_xyz_compiled
+from .harness import benchmark
+
+CAM = tf.constant([475., 475., 320., 240.])
+
+
+@benchmark(resolution=[(240, 320), (480, 640), (1080, 1920)])
+def bench_depth_to_xyz(resolution):
+    depth = tf.random.uniform(resolution, 100, 1000)
+    return lambda: depth_to_xyz(depth, CAM).numpy()
+
+
+@benchmark(batch_size=[16, 64], dtype=["float32", "float16"])
+def bench_depth_to_xyz_batch(batch_size, dtype):
+    depth = tf.random.uniform([batch_size, 480, 640], 100, 1000)
+    return lambda: depth_to_xyz(depth, CAM, dtype=dtype).numpy()
+
+
+@benchmark(resolution=[(240, 320), (480, 640), (1080, 1920)],
+           jit_compile=[False, True])
+def bench_depth_to_xyz_compiled(resolution, jit_compile):
+    depth = tf.random.uniform(resolution, 100, 1000)
+    return lambda: depth_to_xyz_compiled(
+        depth, CAM, jit_compile=jit_compile).numpy()
+
+
+@benchmark(batch_size=[1, 16, 64], n_points=[1000, 100000])
+def bench_xyz_to_uvd(batch_size, n_points):
+    xyz = tf.random.uniform([batch_size, n_points, 3], 100, 1000)
+    cam = tf.tile(CAM[tf.newaxis], [batch_size, 1])
+    return lambda: xyz_to_uvd(xyz, cam).numpy()
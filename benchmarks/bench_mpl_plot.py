@@ -0,0 +1,25 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from common_utilities.mpl_plot.animation import BlitAnimator3D  # noqa: E402
+from .harness import benchmark  # noqa: E402
+
+N_JOINTS = 21
+
+
+@benchmark(n_frames=[50], blit=[True, False])
+def bench_skeleton_animation(n_frames, blit):
+    fig = plt.figure()
+    ax = fig.add_subplot(projection="3d")
+    animator = BlitAnimator3D(fig, ax, (-100, -100, -100), 200)
+
+    joints = np.random.uniform(-100, 100, [n_frames, N_JOINTS, 3])
+    bones = np.stack([np.arange(1, N_JOINTS), np.arange(N_JOINTS - 1)], 1)
+    animator.add_points(joints[0])
+    animator.add_bones(joints[0], bones)
+
+    def call():
+        for frame in joints:
+            animator.update(frame, frame, blit=blit)
+    return call
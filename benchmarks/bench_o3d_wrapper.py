@@ -0,0 +1,82 @@
+import numpy as np
+from common_utilities.o3d_wrapper.color import scalar_to_colors
+from common_utilities.o3d_wrapper.instanced_mesh import InstancedMesh
+from common_utilities.o3d_wrapper.mesh import Mesh
+from common_utilities.o3d_wrapper.point_cloud import PointCloud
+from common_utilities.o3d_wrapper.skeleton import SkeletonLineset
+from .harness import benchmark, grid_mesh
+
+
+def _random_points(n_points):
+    return np.random.uniform(-500, 500, [n_points, 3]).astype(np.float32)
+
+
+@benchmark(n_points=[10000, 1000000])
+def bench_point_cloud_update(n_points):
+    pc = PointCloud(_random_points(n_points))
+    pts = _random_points(n_points)
+    return lambda: (pc.update(pts), pc.pcd)
+
+
+@benchmark(n_points=[100000, 1000000], k=[1, 8], workers=[1, -1])
+def bench_point_cloud_query_knn(n_points, k, workers):
+    pc = PointCloud(_random_points(n_points))
+    query = _random_points(100000)
+    pc.kdtree  # tree is built once and cached
+    return lambda: pc.query_knn(query, k, workers)
+
+
+@benchmark(n_points=[100000, 1000000])
+def bench_point_cloud_build_kdtree(n_points):
+    pc = PointCloud(_random_points(n_points))
+    pts = pc.pts.copy()
+    return lambda: (pc.update(pts), pc.kdtree)
+
+
+@benchmark(n_points=[100000, 1000000])
+def bench_point_cloud_crop(n_points):
+    pts = _random_points(n_points)
+    pc = PointCloud(pts)
+
+    def call():
+        pc.update(pts)
+        pc.crop([-250, -250, -250], [250, 250, 250])
+    return call
+
+
+@benchmark(n_elements=[10000, 1000000])
+def bench_scalar_to_colors(n_elements):
+    values = np.random.rand(n_elements).astype(np.float32)
+    out = np.empty([n_elements, 3])
+    return lambda: scalar_to_colors(values, 0, 1, out=out)
+
+
+@benchmark(n_faces=[10000, 1000000])
+def bench_mesh_set_scalar_field(n_faces):
+    verts, triangles = grid_mesh(n_faces)
+    mesh = Mesh(verts, triangles)
+    values = verts[:, 0]
+    return lambda: mesh.set_scalar_field(values, 0, 100)
+
+
+@benchmark(n_faces=[10000, 100000])
+def bench_mesh_update(n_faces):
+    verts, triangles = grid_mesh(n_faces)
+    mesh = Mesh(verts, triangles)
+    return lambda: mesh.update(verts)
+
+
+@benchmark(n_instances=[1, 50])
+def bench_instanced_mesh_update(n_instances):
+    verts, triangles = grid_mesh(2000)
+    verts = np.tile(verts[np.newaxis], [n_instances, 1, 1])
+    mesh = InstancedMesh(verts, triangles)
+    return lambda: mesh.update(verts)
+
+
+@benchmark(n_skeletons=[1, 100])
+def bench_skeleton_lineset_update(n_skeletons):
+    parents = np.arange(-1, 20)  # kinematic chain of 21 joints
+    joints = _random_points(n_skeletons * 21).reshape([n_skeletons, 21, 3])
+    skeleton = SkeletonLineset(joints, parents)
+    return lambda: skeleton.update(joints)
@@ -0,0 +1,53 @@
+import numpy as np
+import tensorflow as tf
+from common_utilities.point_mesh_distance import PointMeshDistance, \
+    point_mesh_distance_tf_compiled
+from .harness import benchmark, grid_mesh
+
+
+def _points_near_surface(verts, n_points, noise):
+    rng = np.random.RandomState(0)
+    ids = rng.randint(len(verts), size=n_points)
+    return verts[ids] + noise * rng.randn(n_points, 3).astype(verts.dtype)
+
+
+@benchmark(n_faces=[10000, 100000], n_points=[10000, 100000],
+           noise=[0.1, 1.0])
+def bench_point_mesh_distance_query(n_faces, n_points, noise):
+    verts, triangles = grid_mesh(n_faces)
+    engine = PointMeshDistance(verts, triangles)
+    points = _points_near_surface(verts, n_points, noise)
+    engine.kdtrees  # trees are built once and cached
+    return lambda: engine.query(points)
+
+
+@benchmark(n_points=[10000, 100000])
+def bench_point_mesh_distance_query_mixed_sizes(n_points):
+    verts, triangles = grid_mesh(100000)
+    points = _points_near_surface(verts, n_points, 1.0)
+    # one large triangle behind the grid, e.g. a backdrop in a scan
+    n_verts = len(verts)
+    verts = np.concatenate([verts, np.array(
+        [[-500, -500, -5], [1500, -500, -5], [-500, 1500, -5]],
+        dtype=verts.dtype)])
+    triangles = np.concatenate(
+        [triangles, [[n_verts, n_verts + 1, n_verts + 2]]])
+    engine = PointMeshDistance(verts, triangles)
+    engine.kdtrees  # trees are built once and cached
+    return lambda: engine.query(points)
+
+
+@benchmark(n_faces=[100000])
+def bench_point_mesh_distance_update(n_faces):
+    verts, triangles = grid_mesh(n_faces)
+    engine = PointMeshDistance(verts, triangles)
+    return lambda: (engine.update(verts), engine.kdtrees)
+
+
+@benchmark(n_points=[10000, 100000])
+def bench_point_mesh_distance_tf(n_points):
+    verts, triangles = grid_mesh(100000)
+    points = _points_near_surface(verts, n_points, 1.0)
+    _, ids_triangle, _ = PointMeshDistance(verts, triangles).query(points)
+    args = [tf.constant(x) for x in (points, verts, triangles, ids_triangle)]
+    return lambda: point_mesh_distance_tf_compiled(*args).numpy()
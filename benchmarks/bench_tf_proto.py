@@ -0,0 +1,31 @@
+import tensorflow as tf
+from common_utilities.tf_proto.example_proto import \
+    construct_proto, parse_proto
+from .harness import benchmark
+
+KEYS = ["depth", "joints"]
+DTYPES = [tf.float32, tf.float32]
+FEATURE_DESCRIPTION = {
+    key: tf.io.FixedLenFeature([], tf.string) for key in KEYS
+}
+
+
+def _tensors():
+    return [tf.random.uniform([240, 320]), tf.random.uniform([21, 3])]
+
+
+@benchmark(n_records=[10, 100, 1000])
+def bench_construct_proto(n_records):
+    records = [_tensors() for _ in range(n_records)]
+    return lambda: [construct_proto(tensors, KEYS) for tensors in records]
+
+
+@benchmark(n_records=[10, 100, 1000])
+def bench_parse_proto(n_records):
+    protos = [
+        construct_proto(_tensors(), KEYS).SerializeToString()
+        for _ in range(n_records)
+    ]
+    return lambda: [
+        parse_proto(proto, FEATURE_DESCRIPTION, DTYPES) for proto in protos
+    ]
@@ -0,0 +1,24 @@
+import tensorflow as tf
+from common_utilities.transformation.representation import \
+    axis_angle2rot_mat, rot_mat2axis_angle
+from common_utilities.transformation.rotate import rotate_x
+from .harness import benchmark
+
+
+@benchmark(n_points=[1000, 100000, 1000000])
+def bench_rotate_x(n_points):
+    points = tf.random.normal([n_points, 3])
+    angle = tf.constant(0.5)
+    return lambda: rotate_x(points, angle).numpy()
+
+
+@benchmark(batch_size=[1, 64, 4096])
+def bench_axis_angle2rot_mat(batch_size):
+    axis_angle = tf.random.normal([batch_size, 16, 3])
+    return lambda: axis_angle2rot_mat(axis_angle).numpy()
+
+
+@benchmark(batch_size=[1, 64, 4096])
+def bench_rot_mat2axis_angle(batch_size):
+    rot_mat = axis_angle2rot_mat(tf.random.normal([batch_size, 16, 3]))
+    return lambda: rot_mat2axis_angle(rot_mat).numpy()
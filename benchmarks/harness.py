@@ -0,0 +1,136 @@
+import itertools
+import json
+import statistics
+import time
+import numpy as np
+
+_registry = {}
+
+
+def benchmark(**params):
+    """Registers benchmark run for every combination of `params`.
+
+    The decorated function receives one value per param, does its setup and
+    returns a callable without arguments that is timed.
+
+    Example
+    -------
+    @benchmark(n_faces=[1000, 100000])
+    def bench_sampling(n_faces):
+        verts, triangles = grid_mesh(n_faces)
+        return lambda: compute_barycentric_coords(verts, triangles, 1000)
+    """
+    def decorator(fn):
+        keys = list(params.keys())
+        for values in itertools.product(*params.values()):
+            kwargs = dict(zip(keys, values))
+            name = "{}.{}[{}]".format(
+                fn.__module__.rsplit(".", 1)[-1], fn.__name__,
+                ",".join("{}={}".format(k, v) for k, v in kwargs.items())
+            )
+            _registry[name] = (fn, kwargs)
+        return fn
+
+    return decorator
+
+
+def run(pattern=None, repeat=5):
+    """Runs registered benchmarks.
+
+    Arguments
+    ---------
+    pattern : string
+        Only run benchmarks whose name contains `pattern`.
+
+    repeat : int
+        Number of timed calls after one warmup call.
+
+    Returns
+    -------
+    results : dict
+        Maps benchmark name to `min`, `median` and `mean` time in seconds.
+    """
+    results = {}
+    for name, (fn, kwargs) in _registry.items():
+        if pattern is not None and pattern not in name:
+            continue
+
+        call = fn(**kwargs)
+        call()  # warmup, e.g. tf.function tracing
+        times = []
+        for _ in range(repeat):
+            time_start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - time_start)
+
+        results[name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+        }
+        print("{:<70} {:>10.3f} ms".format(
+            name, 1e3 * results[name]["median"]))
+
+    return results
+
+
+def save(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Returns benchmarks whose median time regressed beyond `tolerance`.
+
+    Arguments
+    ---------
+    results, baseline : dict
+        Output of `run` for current and saved baseline run.
+
+    tolerance : float
+        Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns
+    -------
+    regressions : dict
+        Maps benchmark name to ratio of current to baseline median time.
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+
+    return regressions
+
+
+def grid_mesh(n_faces, size=100.0):
+    """Returns flat square grid mesh with about `n_faces` triangles.
+
+    Returns
+    -------
+    verts : np.ndarray of shape (n_verts, 3)
+
+    triangles : np.ndarray of shape (n_triangles, 3)
+    """
+    n = max(int(np.sqrt(n_faces / 2)), 1)
+    coords = np.linspace(0, size, n + 1, dtype=np.float32)
+    xx, yy = np.meshgrid(coords, coords, indexing="ij")
+    verts = np.stack([xx, yy, np.zeros_like(xx)], axis=-1).reshape(-1, 3)
+
+    ids = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+    v00, v01 = ids[:-1, :-1].ravel(), ids[:-1, 1:].ravel()
+    v10, v11 = ids[1:, :-1].ravel(), ids[1:, 1:].ravel()
+    triangles = np.concatenate([
+        np.stack([v00, v10, v11], axis=-1),
+        np.stack([v00, v11, v01], axis=-1),
+    ]).astype(np.int32)
+
+    return verts, triangles
@@ -1,6 +1,9 @@
 import tensorflow as tf
+from common_utilities.compiled import FOLLOW, CompiledFunction
+from common_utilities.profiling import profile
 
 
+@profile
 def xyz_to_uvd(xyz, cam):
     """Convert points from camera to image frame.
 
@@ -13,16 +16,21 @@ def xyz_to_uvd(xyz, cam):
 
     Returns
     -------
-    uvd : same shape as `xyz`
+    uvd : same shape and dtype as `xyz`
         image coordinates. Note d is same as z.
     """
-    uv = xyz[..., :2] * cam[..., tf.newaxis, :2] \
-        / xyz[..., 2:3] + cam[..., tf.newaxis, 2:]
+    xyz = tf.convert_to_tensor(xyz)
+    cam = tf.cast(cam, xyz.dtype)
+
+    # divide first, x * fx overflows float16 for millimetre coordinates
+    uv = xyz[..., :2] / xyz[..., 2:3] * cam[..., tf.newaxis, :2] \
+        + cam[..., tf.newaxis, 2:]
     uvd = tf.concat([uv, xyz[..., 2:]], axis=-1)
 
     return uvd
 
 
+@profile
 def uvd_to_xyz(uvd, cam):
     """Convert points from image to camera frame.
 
@@ -35,58 +43,87 @@ def uvd_to_xyz(uvd, cam):
 
     Returns
     -------
-    xyz : same shape as `uvd`
+    xyz : same shape and dtype as `uvd`
         camera coordinates. Note z is same as d.
     """
+    uvd = tf.convert_to_tensor(uvd)
+    cam = tf.cast(cam, uvd.dtype)
+
+    # divide first, (u - cx) * d overflows float16 for millimetre depths
     xy = (uvd[..., :2] - cam[..., tf.newaxis, 2:]) \
-        * uvd[..., 2:] / cam[..., tf.newaxis, :2]
+        / cam[..., tf.newaxis, :2] * uvd[..., 2:]
     xyz = tf.concat([xy, uvd[..., 2:]], axis=-1)
 
     return xyz
 
 
+@profile
 def depth_to_uvd(depth):
     """Returns uvd points from depth.
 
     Arguments
     ---------
-    depth : shape=(h, w)
+    depth : shape=(b, h, w); optional b
         depth image
 
     Returns
     -------
-    uvd : shape=(h*w, 3)
-        uvd points of corresponding depth
+    uvd : shape=(b, h*w, 3); optional b
+        uvd points of corresponding depth. dtype is same as `depth`.
+        Note: float16 represents pixel coordinates exactly only up to 2048.
     """
-    coords_v = tf.range(depth.shape[0], dtype=tf.float32)
-    coords_u = tf.range(depth.shape[1], dtype=tf.float32)
+    depth = tf.convert_to_tensor(depth)
+    shape = tf.shape(depth)
+
+    # dynamic shape so that traced version accepts any resolution
+    coords_v = tf.cast(tf.range(shape[-2]), depth.dtype)
+    coords_u = tf.cast(tf.range(shape[-1]), depth.dtype)
     coords_V, coords_U = tf.meshgrid(coords_v, coords_u, indexing="ij")
 
-    uvd = tf.reshape(
-        tf.stack([coords_U, coords_V, depth], axis=2),
-        [-1, 3]
-    )
+    uvd = tf.stack([
+        tf.broadcast_to(coords_U, shape),
+        tf.broadcast_to(coords_V, shape),
+        depth
+    ], axis=-1)
+    uvd = tf.reshape(uvd, tf.concat([shape[:-2], [-1, 3]], axis=0))
 
     return uvd
 
 
-def depth_to_xyz(depth, cam):
+@profile
+def depth_to_xyz(depth, cam, dtype=None):
     """Returns xyz points from depth.
 
     Arguments
     ---------
-    depth : shape=(h, w)
+    depth : shape=(b, h, w); optional b
         depth image
 
-    cam : (4,)
+    cam : (b, 4); optional b
         camera parameters [fx, fy, cx, cy]
 
+    dtype : tf.DType
+        Computes in this dtype instead of dtype of `depth`, e.g. tf.float16
+        to halve memory of large depth batches.
+
     Returns
     -------
-    xyz : shape=(h*w, 3)
+    xyz : shape=(b, h*w, 3); optional b
         xyz points of corresponding depth
     """
+    if dtype is not None:
+        depth = tf.cast(depth, dtype)
+
     depth_uvd = depth_to_uvd(depth)
     depth_xyz = uvd_to_xyz(depth_uvd, cam)
 
     return depth_xyz
+
+
+# compiled versions, traced once per dtype for any number of points
+xyz_to_uvd_compiled = CompiledFunction(
+    xyz_to_uvd, [(None, FOLLOW), (None, FOLLOW)])
+uvd_to_xyz_compiled = CompiledFunction(
+    uvd_to_xyz, [(None, FOLLOW), (None, FOLLOW)])
+depth_to_xyz_compiled = CompiledFunction(
+    depth_to_xyz, [(None, FOLLOW), (None, FOLLOW)])
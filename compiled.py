@@ -0,0 +1,91 @@
+import tensorflow as tf
+
+# dtype placeholder in specs for arguments following the dtype of first one
+FOLLOW = None
+
+
+class CompiledFunction:
+    """`tf.function` wrapper with one fixed input signature per dtype.
+
+    Shapes in the signature use `None` dims, so calls with new point counts
+    or batch sizes reuse the existing trace. A separate trace is created for
+    each dtype of the first argument and each `jit_compile` setting.
+
+    Attributes
+    ----------
+    trace_counts : dict
+        Number of traces per (dtype, jit_compile). Stays at 1 per key unless
+        the function is retraced.
+    """
+
+    def __init__(self, fn, specs):
+        """Wraps `fn` with given argument specs.
+
+        Arguments
+        ---------
+        fn : callable
+            Function of tensors only.
+
+        specs : list of tuple (shape, dtype)
+            Shape and dtype of each argument. `shape=None` allows any rank.
+            `dtype=FOLLOW` uses dtype of first argument.
+        """
+        self._fn = fn
+        self._specs = specs
+        self._compiled = {}
+        self.trace_counts = {}
+        self.__name__ = getattr(fn, "__name__", "compiled")
+        self.__doc__ = fn.__doc__
+
+    @property
+    def trace_count(self):
+        """Total number of traces over all dtypes."""
+        return sum(self.trace_counts.values())
+
+    def get_concrete(self, dtype, jit_compile=False):
+        """Returns `tf.function` for given dtype of first argument."""
+        key = (tf.as_dtype(dtype), jit_compile)
+        if key not in self._compiled:
+            signature = [
+                tf.TensorSpec(shape, key[0] if spec_dtype is FOLLOW
+                              else spec_dtype)
+                for shape, spec_dtype in self._specs
+            ]
+
+            def traced(*args):
+                # python side effect, only runs while tracing
+                self.trace_counts[key] = self.trace_counts.get(key, 0) + 1
+                return self._fn(*args)
+
+            self._compiled[key] = tf.function(
+                traced, input_signature=signature, jit_compile=jit_compile)
+
+        return self._compiled[key]
+
+    def __call__(self, *args, jit_compile=False):
+        """Calls compiled function, casting arguments to signature dtypes.
+
+        Arguments
+        ---------
+        *args
+            Arguments of wrapped function.
+
+        jit_compile : bool
+            Compile with XLA.
+        """
+        first = tf.convert_to_tensor(args[0])
+        args = [first] + [
+            _convert(arg, first.dtype if spec_dtype is FOLLOW else spec_dtype)
+            for arg, (_, spec_dtype) in zip(args[1:], self._specs[1:])
+        ]
+
+        return self.get_concrete(first.dtype, jit_compile)(*args)
+
+
+def _convert(arg, dtype):
+    """Converts to tensor, casting within integer or floating point kinds."""
+    tensor = tf.convert_to_tensor(arg)
+    if tensor.dtype != dtype and tensor.dtype.is_integer == dtype.is_integer:
+        tensor = tf.cast(tensor, dtype)
+
+    return tensor
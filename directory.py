@@ -1,13 +1,262 @@
-import tensorflow as tf
+import os
+import shutil
+import threading
+import uuid
+from common_utilities.profiling import profile
+
+
+def _is_remote(path):
+    """Returns True for paths with a filesystem scheme, e.g. gs://."""
+    return "://" in path
+
+
+def _gfile():
+    # imported lazily so local paths do not require tensorflow
+    import tensorflow as tf
+    return tf.io.gfile
+
+
+class DirectoryManager:
+    """Creates and deletes directories, caching paths known to exist.
+
+    Local paths use `os` directly. Paths with a scheme (gs://, hdfs://, ...)
+    go through `tf.io.gfile`. Paths are assumed not to be removed by other
+    processes while cached; call `clear_cache` otherwise.
+
+    Remote paths being deleted in background are not usable until deletion
+    finishes. Calls touching such a path wait for its deletion first.
+    """
+
+    def __init__(self, cache=True):
+        """Creates manager with empty cache.
+
+        Arguments
+        ---------
+        cache : bool
+            Cache paths known to exist. If False, every call checks the
+            filesystem and only background deletions are tracked.
+        """
+        self.cache = cache
+        self._existing = set()
+        self._lock = threading.Lock()
+        # (remote path or None, thread) of running deletions
+        self._deletions = []
+
+    def exists(self, path):
+        """Returns True if `path` exists, checking the cache first."""
+        path = self._normalize(path)
+        self._wait_remote(path)
+        if path in self._existing:
+            return True
+
+        if _is_remote(path):
+            exists = _gfile().exists(path)
+        else:
+            exists = os.path.exists(path)
+        if exists:
+            self._add(path)
+
+        return exists
+
+    @profile
+    def create_dir(self, path, flag_delete_existing=False):
+        """Returns True if created new dir, else False.
+
+        Arguments
+        ---------
+        path : string
+            Directory to create along with missing parents.
+
+        flag_delete_existing : bool
+            Delete `path` first if it exists. Deletion runs in background.
+        """
+        path = self._normalize(path)
+        if flag_delete_existing:
+            self.delete(path)
+        elif path in self._existing:
+            return False
+        self._wait_remote(path)
+
+        if _is_remote(path):
+            gfile = _gfile()
+            created = not gfile.exists(path)
+            if created:
+                gfile.makedirs(path)
+        else:
+            try:
+                os.makedirs(path)
+                created = True
+            except FileExistsError:
+                created = False
+        self._add(path)
+
+        return created
+
+    @profile
+    def create_tree(self, root, subdirs, flag_delete_existing=False):
+        """Creates `root` and all `subdirs` below it in one pass.
+
+        Arguments
+        ---------
+        root : string
+            Root directory of tree.
+
+        subdirs : list of string
+            Directories relative to `root`, e.g. "checkpoints/best".
+
+        flag_delete_existing : bool
+            Delete `root` first if it exists. Deletion runs in background.
+
+        Returns
+        -------
+        paths : list of string
+            Full path of each subdir in the order of `subdirs`.
+        """
+        root = self._normalize(root)
+        self.create_dir(root, flag_delete_existing)
+
+        paths = [self._join(root, subdir) for subdir in subdirs]
+        # parents are created by makedirs, so only leaves need a call
+        leaves = set(paths)
+        for path in paths:
+            parent = os.path.dirname(path)
+            while len(parent) > len(root):
+                leaves.discard(parent)
+                parent = os.path.dirname(parent)
+
+        for path in sorted(leaves):
+            if path in self._existing:
+                continue
+            if _is_remote(path):
+                _gfile().makedirs(path)
+            else:
+                os.makedirs(path, exist_ok=True)
+            self._add(path)
+
+        return paths
+
+    @profile
+    def delete(self, path, block=False):
+        """Deletes `path` if it exists.
+
+        Local directories are first renamed to a unique sibling so that
+        `path` can be recreated immediately, then removed in a background
+        thread. Remote filesystems implement rename by copying every
+        object, so remote directories are removed in place in background
+        and `path` is only recreated after removal finished.
+
+        Arguments
+        ---------
+        path : string
+            Directory to delete.
+
+        block : bool
+            Wait for deletion to finish.
+
+        Returns
+        -------
+        deleted : bool
+            False if `path` did not exist.
+        """
+        path = self._normalize(path)
+        self._wait_remote(path)
+        with self._lock:
+            self._existing = {
+                p for p in self._existing
+                if p != path and not p.startswith(path + "/")
+            }
+
+        if _is_remote(path):
+            gfile = _gfile()
+            if not gfile.exists(path):
+                return False
+            path_remove, path_pending, remove = path, path, gfile.rmtree
+        else:
+            path_remove = "{}.deleting-{}".format(path, uuid.uuid4().hex)
+            try:
+                os.rename(path, path_remove)
+            except FileNotFoundError:
+                return False
+            path_pending, remove = None, _rmtree
+
+        thread = threading.Thread(target=remove, args=(path_remove,))
+        thread.start()
+        with self._lock:
+            self._deletions = [
+                (p, t) for p, t in self._deletions if t.is_alive()]
+            self._deletions.append((path_pending, thread))
+        if block:
+            thread.join()
+
+        return True
+
+    def wait(self):
+        """Blocks until all background deletions are finished."""
+        with self._lock:
+            deletions, self._deletions = self._deletions, []
+        for _, thread in deletions:
+            thread.join()
+
+    def _wait_remote(self, path):
+        """Blocks until background deletions of remote `path`, its parents
+        or children are finished."""
+        if not _is_remote(path):
+            return
+
+        with self._lock:
+            threads = [
+                t for p, t in self._deletions
+                if p is not None and (p == path or path.startswith(p + "/")
+                                      or p.startswith(path + "/"))
+            ]
+        for thread in threads:
+            thread.join()
+
+    def clear_cache(self):
+        """Forgets all paths known to exist."""
+        with self._lock:
+            self._existing = set()
+
+    def _add(self, path):
+        """Caches `path` and its parents as existing."""
+        if not self.cache:
+            return
+        with self._lock:
+            while path and path not in self._existing:
+                self._existing.add(path)
+                parent = os.path.dirname(path)
+                if parent == path or \
+                        (_is_remote(path) and not _is_remote(parent)):
+                    break
+                path = parent
+
+    @staticmethod
+    def _normalize(path):
+        path = os.fspath(path)
+        if _is_remote(path):
+            return path.rstrip("/")
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _join(root, subdir):
+        if _is_remote(root):
+            return root + "/" + subdir.strip("/")
+        return os.path.normpath(os.path.join(root, subdir))
+
+
+def _rmtree(path):
+    """Removes local directory tree, ignoring files already gone."""
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# not caching, directories may be removed by other code between calls
+_manager = DirectoryManager(cache=False)
 
 
 def create_dir(path: str, flag_delete_existing: bool) -> bool:
-    """Returns True if created new dir, else False."""
-    if flag_delete_existing and tf.io.gfile.exists(path):
-        tf.io.gfile.rmtree(path)
-    if not tf.io.gfile.exists(path):
-        tf.io.gfile.makedirs(path)
-    else:
-        return False
-
-    return True
+    """Returns True if created new dir, else False.
+
+    Always checks the filesystem. Deletion of an existing dir runs in
+    background. Use a `DirectoryManager` to cache existing paths.
+    """
+    return _manager.create_dir(path, flag_delete_existing)
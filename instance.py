@@ -1,16 +1,89 @@
-import tensorflow as tf
+import sys
+import numpy as np
 
 
 def tf2np(tensor):
-    """Converts tensorflow tensor to numpy if not numpy."""
+    """Converts tensorflow tensor to numpy if not numpy.
+
+    Nested dicts, lists and tuples are converted leaf by leaf, keeping their
+    structure. Numeric tensors of rank >= 1 already on host are returned as
+    numpy views sharing memory with the tensor, they must not be modified.
+    Scalars and string tensors keep the types of `numpy()`, e.g. `bytes`
+    and `np.float32`. Numeric tensors on other devices are copied to host
+    in one transfer per device and dtype, and split into views of the
+    transferred array.
+
+    Tensorflow is not imported here. If the caller has not imported it, no
+    tensor can exist and `tensor` is returned unchanged.
+    """
+    tf = sys.modules.get("tensorflow")
+    if tf is None:
+        return tensor
     if isinstance(tensor, tf.Tensor):
-        tensor = tensor.numpy()
-    return tensor
+        return _to_numpy(tensor)
+    if not isinstance(tensor, (dict, list, tuple)):
+        return tensor
+
+    flat = tf.nest.flatten(tensor)
+    flat_np = list(flat)
+    ids_per_device = {}
+    for idx, leaf in enumerate(flat):
+        if not isinstance(leaf, tf.Tensor):
+            continue
+        if _on_host(leaf) or leaf.dtype == tf.string:
+            flat_np[idx] = _to_numpy(leaf)
+        else:
+            ids_per_device.setdefault(
+                (leaf.device, leaf.dtype), []).append(idx)
+
+    for (device, _), ids in ids_per_device.items():
+        if len(ids) == 1:
+            flat_np[ids[0]] = flat[ids[0]].numpy()
+            continue
+
+        with tf.device(device):
+            packed = tf.concat(
+                [tf.reshape(flat[idx], [-1]) for idx in ids], axis=0)
+        packed = packed.numpy()
+
+        sizes = [int(np.prod(flat[idx].shape)) for idx in ids]
+        for idx, chunk in zip(ids, np.split(packed, np.cumsum(sizes)[:-1])):
+            # numpy scalar for rank 0, as returned by `numpy()`
+            flat_np[idx] = chunk.reshape(flat[idx].shape) \
+                if flat[idx].shape.rank else chunk[0]
+
+    return tf.nest.pack_sequence_as(tensor, flat_np)
+
+
+def _to_numpy(tensor):
+    """Returns view of numeric host tensor, copies tensors on other devices.
+    Scalars and strings are returned as by `numpy()`."""
+    if _viewable(tensor) and _on_host(tensor):
+        # `numpy()` copies, `__array__` shares memory
+        return np.asarray(tensor)
+    return tensor.numpy()
+
+
+def _viewable(tensor):
+    """Returns True for numeric tensors of rank >= 1. `np.asarray` turns
+    scalars into 0-d arrays and strings into object arrays."""
+    tf = sys.modules["tensorflow"]
+    return tensor.shape.rank != 0 and tensor.dtype != tf.string
+
+
+def _on_host(tensor):
+    """Returns True if eager tensor is placed on CPU."""
+    tf = sys.modules["tensorflow"]
+    return tf.DeviceSpec.from_string(tensor.device).device_type in \
+        (None, "CPU")
 
 
 def make_list(obj):
-    """Makes list of obj if obj is not a list already."""
-    if not isinstance(obj, list):
+    """Makes list of obj if obj is not a list already. Tuples are converted
+    to lists."""
+    if isinstance(obj, tuple):
+        obj = list(obj)
+    elif not isinstance(obj, list):
         obj = [obj]
 
     return obj
@@ -0,0 +1,153 @@
+import time
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from .axes import format_3d_axes
+
+
+class BlitAnimator3D:
+    """Animates points and bones on a 3D axes using blitting.
+
+    Axes are formatted once and the static background is cached. Each frame
+    only restores the background and redraws the animated artists.
+
+    Attributes
+    ----------
+    fig : matplotlib.Figure
+
+    ax : mpl_toolkits.mplot3d.Axes3D
+    """
+
+    def __init__(self, fig, ax, axis_start, axis_range):
+        """Formats axes for animation.
+
+        Arguments
+        ---------
+        fig : matplotlib.Figure
+
+        ax : mpl_toolkits.mplot3d.Axes3D
+
+        axis_start : tuple of 3 scalars
+            start limit of axis
+
+        axis_range : scalar
+            defines common range for all axis.
+        """
+        self.fig, self.ax = fig, ax
+        format_3d_axes(ax, axis_start, axis_range)
+
+        self._artists = []
+        self._background = None
+        # background is invalid after resize or other full redraws
+        fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def add_points(self, pts, **kwargs):
+        """Adds animated scatter of points.
+
+        Arguments
+        ---------
+        pts : np.ndarray of shape (n, 3)
+            Initial position of points.
+
+        **kwargs
+            Passed to `ax.scatter`.
+
+        Returns
+        -------
+        idx : int
+            Index of artist for `update`.
+        """
+        pts = np.asarray(pts)
+        scatter = self.ax.scatter(pts[:, 0], pts[:, 1], pts[:, 2],
+                                  animated=True, **kwargs)
+        self._artists.append((scatter, None))
+        self._background = None
+
+        return len(self._artists) - 1
+
+    def add_bones(self, pts, bones, **kwargs):
+        """Adds animated bones as a single line collection.
+
+        Arguments
+        ---------
+        pts : np.ndarray of shape (n, 3)
+            Initial position of joints.
+
+        bones : np.ndarray of shape (n_bones, 2)
+            Indices of joints connected by each bone.
+
+        **kwargs
+            Passed to `Line3DCollection`.
+
+        Returns
+        -------
+        idx : int
+            Index of artist for `update`.
+        """
+        bones = np.asarray(bones)
+        lines = Line3DCollection(np.asarray(pts)[bones], **kwargs)
+        lines.set_animated(True)
+        self.ax.add_collection3d(lines)
+        self._artists.append((lines, bones))
+        self._background = None
+
+        return len(self._artists) - 1
+
+    def update(self, *pts_per_artist, blit=True):
+        """Moves artists to new positions and draws the frame.
+
+        Arguments
+        ---------
+        *pts_per_artist : np.ndarray of shape (n, 3)
+            New position for each artist in order of adding.
+
+        blit : bool
+            Redraw only artists. If False, redraws whole figure.
+        """
+        for (artist, bones), pts in zip(self._artists, pts_per_artist):
+            pts = np.asarray(pts)
+            if bones is None:
+                artist._offsets3d = (pts[:, 0], pts[:, 1], pts[:, 2])
+            else:
+                artist.set_segments(pts[bones])
+
+        canvas = self.fig.canvas
+        if not blit:
+            canvas.draw()
+            canvas.flush_events()
+            return
+
+        if self._background is None:
+            canvas.draw()  # caches background in `_on_draw`
+        else:
+            canvas.restore_region(self._background)
+            self._draw_artists()
+        canvas.blit(self.ax.bbox)
+        canvas.flush_events()
+
+    def measure_fps(self, frames, blit=True):
+        """Returns frames per second of animating `frames`.
+
+        Arguments
+        ---------
+        frames : list of tuple of np.ndarray
+            Arguments of `update` for each frame.
+
+        blit : bool
+            Measure blitting, else full redraw.
+        """
+        self.update(*frames[0], blit=blit)  # warmup, caches background
+        time_start = time.perf_counter()
+        for frame in frames:
+            self.update(*frame, blit=blit)
+
+        return len(frames) / (time.perf_counter() - time_start)
+
+    def _on_draw(self, event):
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist, _ in self._artists:
+            # 3d collections are projected by Axes3D.draw, not draw_artist
+            artist.do_3d_projection()
+            self.ax.draw_artist(artist)
@@ -1,3 +1,8 @@
+from matplotlib.artist import setp
+from common_utilities.profiling import profile
+
+
+@profile
 def format_3d_axes(ax, axis_start, axis_range):
     """Formats 3d plot.
 
@@ -33,12 +38,9 @@ def format_3d_axes(ax, axis_start, axis_range):
     ax.zaxis._axinfo['tick']['outward_factor'] = 0.4
     ax.zaxis._axinfo['tick']['outward_factor'] = 0.4
 
-    [t.set_va('center') for t in ax.get_yticklabels()]
-    [t.set_ha('left') for t in ax.get_yticklabels()]
-    [t.set_va('center') for t in ax.get_xticklabels()]
-    [t.set_ha('right') for t in ax.get_xticklabels()]
-    [t.set_va('center') for t in ax.get_zticklabels()]
-    [t.set_ha('left') for t in ax.get_zticklabels()]
+    setp(ax.get_yticklabels(), va='center', ha='left')
+    setp(ax.get_xticklabels(), va='center', ha='right')
+    setp(ax.get_zticklabels(), va='center', ha='left')
 
     # set labels
     ax.set_xlabel("X (mm)")
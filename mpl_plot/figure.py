@@ -1,8 +1,10 @@
 import io
 import matplotlib.pyplot as plt
 import tensorflow as tf
+from common_utilities.profiling import profile
 
 
+@profile
 def figure_to_image(fig):
     """Converts matplotlib figure to PNG image and closes the figure."""
     # save figure to PNG in memory
@@ -19,6 +21,7 @@ def figure_to_image(fig):
     return img
 
 
+@profile
 def image_to_figure(img):
     """Plots image on figure and returns the figure."""
     # remove batch axis
@@ -44,6 +47,7 @@ def image_to_figure(img):
     return fig
 
 
+@profile
 def make_loggable_image_plot(img):
     """Plots image and returns as tensor with batch axis for logging."""
     fig = image_to_figure(img)
@@ -0,0 +1,98 @@
+from functools import lru_cache
+import numpy as np
+import matplotlib
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(cmap="jet", n_levels=256):
+    """Returns lookup table of RGB colors sampled from matplotlib colormap.
+
+    Arguments
+    ---------
+    cmap : string
+        Name of matplotlib colormap.
+
+    n_levels : int
+        Number of entries in lookup table.
+
+    Returns
+    -------
+    lut : np.ndarray of shape (n_levels, 3)
+        RGB colors in [0, 1]. Read only as it is shared between calls.
+    """
+    lut = matplotlib.colormaps[cmap](np.linspace(0, 1, n_levels))[:, :3]
+    lut = np.ascontiguousarray(lut, dtype=np.float64)
+    lut.flags.writeable = False
+
+    return lut
+
+
+def scalar_to_colors(values, vmin=None, vmax=None, cmap="jet",
+                     n_levels=256, out=None):
+    """Maps scalar field to RGB colors through a colormap lookup table.
+
+    Arguments
+    ---------
+    values : np.ndarray of shape (n,)
+        Scalar value for each element.
+
+    vmin, vmax : float
+        Values mapped to the ends of colormap. Defaults to min and max of
+        `values`. Values outside are clipped.
+
+    cmap : string
+        Name of matplotlib colormap.
+
+    n_levels : int
+        Number of quantization levels of colormap.
+
+    out : np.ndarray of shape (n, 3)
+        If given, colors are written into this array, e.g. an `open3d`
+        color buffer viewed through `np.asarray`.
+
+    Returns
+    -------
+    colors : np.ndarray of shape (n, 3)
+        RGB colors in [0, 1].
+    """
+    values = np.asarray(values)
+    if vmin is None:
+        vmin = np.min(values)
+    if vmax is None:
+        vmax = np.max(values)
+
+    scale = (n_levels - 1) / max(vmax - vmin, np.finfo(np.float32).eps)
+    ids = (values - vmin) * scale
+    np.clip(ids, 0, n_levels - 1, out=ids)
+    ids = ids.astype(np.int32)
+
+    lut = colormap_lut(cmap, n_levels)
+    if out is None:
+        return lut[ids]
+    np.take(lut.astype(out.dtype, copy=False), ids, axis=0, out=out)
+
+    return out
+
+
+def write_colors(vector, colors):
+    """Writes colors into `open3d` Vector3dVector, in place if sizes match.
+
+    Arguments
+    ---------
+    vector : `open3d.utility.Vector3dVector`
+        Color buffer of `open3d` geometry.
+
+    colors : np.ndarray of shape (n, 3)
+        RGB colors in [0, 1].
+
+    Returns
+    -------
+    written : bool
+        `False` if sizes differ and nothing was written.
+    """
+    buffer = np.asarray(vector)
+    if buffer.shape != np.shape(colors):
+        return False
+    buffer[:] = colors
+
+    return True
@@ -0,0 +1,60 @@
+import numpy as np
+from common_utilities.instance import tf2np
+from .mesh import Mesh
+from common_utilities.profiling import profile
+
+
+class InstancedMesh(Mesh):
+    """Many meshes sharing the same topology merged into one `Mesh`.
+
+    Triangles of instance `i` index vertices offset by `i * n_verts`, so all
+    instances are uploaded and updated as a single geometry.
+
+    Attributes
+    ----------
+    n_instances : int
+        Number of mesh instances.
+
+    n_verts : int
+        Number of vertices in each instance.
+    """
+
+    def __init__(self, verts, triangles, color=[247, 174, 72]):
+        """Creates merged mesh of all instances.
+
+        Arguments
+        ---------
+        verts : np.ndarray of shape (B, N, 3)
+            Vertices of each instance.
+
+        triangles : np.ndarray of shape (F, 3)
+            Vertex indices for each triangle, shared by all instances.
+
+        color : array_like of shape (3,)
+            RGB color triplet. color in [0, 255].
+        """
+        verts, triangles = tf2np((verts, triangles))
+
+        self.n_instances, self.n_verts = verts.shape[:2]
+        offsets = np.arange(self.n_instances)[:, np.newaxis, np.newaxis] \
+            * self.n_verts
+        triangles_merged = np.reshape(triangles[np.newaxis] + offsets, [-1, 3])
+
+        super().__init__(np.reshape(verts, [-1, 3]), triangles_merged, color)
+
+    @profile
+    def update(self, verts, update_normals=True):
+        """Updates vertices of all instances with a single buffer write.
+
+        Arguments
+        ---------
+        verts : np.ndarray of shape (B, N, 3)
+            Updated vertices of each instance.
+        """
+        verts = tf2np(verts)
+        super().update(np.reshape(verts, [-1, 3]), update_normals)
+
+    def get_instance_verts(self):
+        """Returns vertices of each instance of shape (B, N, 3)."""
+        return np.reshape(self.get_verts(),
+                          [self.n_instances, self.n_verts, 3])
@@ -1,5 +1,8 @@
 import open3d as o3d
-import tensorflow as tf
+import numpy as np
+from common_utilities.instance import tf2np
+from . import color as o3d_color
+from common_utilities.profiling import profile
 
 
 class Lineset:
@@ -23,25 +26,56 @@ class Lineset:
             Lines denoted by the index of points forming the line.
         """
 
-        if isinstance(points, tf.Tensor):
-            points = points.numpy()
-        if isinstance(lines, tf.Tensor):
-            lines = lines.numpy()
+        points, lines = tf2np((points, lines))
 
         self.lineset = o3d.geometry.LineSet()
         self.lineset.points = o3d.utility.Vector3dVector(points)
         self.lineset.lines = o3d.utility.Vector2iVector(lines)
-        colors = [color for _ in lines]
+        colors = np.tile(np.asarray(color, dtype=np.float64), (len(lines), 1))
         self.lineset.colors = o3d.utility.Vector3dVector(colors)
 
+    @profile
     def update(self, points):
-        """Update endpoints of lineset.
+        """Update endpoints of lineset. Writes in place if number of points
+        is unchanged.
 
         Arguments
         ---------
         points : np.ndarray of shape (N, 3)
             points coordinates.
         """
-        if isinstance(points, tf.Tensor):
-            points = points.numpy()
-        self.lineset.points = o3d.utility.Vector3dVector(points)
+        points = tf2np(points)
+        buffer = np.asarray(self.lineset.points)
+        if buffer.shape == np.shape(points):
+            buffer[:] = points
+        else:
+            self.lineset.points = o3d.utility.Vector3dVector(points)
+
+    def set_line_colors(self, colors):
+        """Colors each line individually.
+
+        Arguments
+        ---------
+        colors : np.ndarray of shape (n_lines, 3)
+            RGB color of each line.
+        """
+        if not o3d_color.write_colors(self.lineset.colors, colors):
+            self.lineset.colors = o3d.utility.Vector3dVector(
+                np.asarray(colors, dtype=np.float64))
+
+    def set_scalar_field(self, values, vmin=None, vmax=None, cmap="jet"):
+        """Colors lines by mapping a scalar per line through a colormap.
+
+        Arguments
+        ---------
+        values : np.ndarray of shape (n_lines,)
+            Scalar value for each line, e.g. bone length error.
+
+        vmin, vmax : float
+            Values mapped to the ends of colormap. Defaults to min and max.
+
+        cmap : string
+            Name of matplotlib colormap.
+        """
+        o3d_color.scalar_to_colors(
+            values, vmin, vmax, cmap, out=np.asarray(self.lineset.colors))
@@ -1,6 +1,9 @@
 import open3d as o3d
 import tensorflow as tf
 import numpy as np
+from common_utilities.instance import tf2np
+from . import color as o3d_color
+from common_utilities.profiling import profile
 
 
 class Mesh:
@@ -27,24 +30,23 @@ class Mesh:
             RGB color triplet. color in [0, 255].
         """
 
-        if isinstance(verts, tf.Tensor):
-            verts = verts.numpy()
-        if isinstance(triangles, tf.Tensor):
-            triangles = triangles.numpy()
+        verts, triangles = tf2np((verts, triangles))
 
         self.mesh = o3d.geometry.TriangleMesh()
         self.mesh.triangles = o3d.utility.Vector3iVector(triangles)
         # self.lines = o3d.geometry.create_line_set_from_triangle_mesh(self.mesh)
         self.color = color
+        self._per_vertex_color = False
 
         self.update(verts)
 
     def get_verts(self):
-        return np.asarray(self.vertices)
+        return np.asarray(self.mesh.vertices)
 
     def get_triangles(self):
-        return np.asarray(self.triangles)
+        return np.asarray(self.mesh.triangles)
 
+    @profile
     def update(self, verts, update_normals=True):
         """Updates mesh vertices.
 
@@ -53,9 +55,16 @@ class Mesh:
         verts : np.ndarray of shape (N, 3)
             Updated mesh vertices.
         """
-        if isinstance(verts, tf.Tensor):
-            verts = verts.numpy()
-        self.mesh.vertices = o3d.utility.Vector3dVector(verts)
+        verts = tf2np(verts)
+
+        # write into existing buffer when topology is unchanged
+        buffer = self.get_verts()
+        resized = buffer.shape != np.shape(verts)
+        if resized:
+            self.mesh.vertices = o3d.utility.Vector3dVector(
+                np.asarray(verts, dtype=np.float64))
+        else:
+            buffer[:] = verts
         # self.lines.points = o3d.utility.Vector3dVector(verts)
 
         # required for rendering
@@ -63,7 +72,8 @@ class Mesh:
             self.mesh.compute_triangle_normals()
             self.mesh.compute_vertex_normals()
 
-        self.set_color(self.color)
+        if resized and not self._per_vertex_color:
+            self.set_color(self.color)
 
     def set_color(self, color):
         """Color point cloud.
@@ -74,9 +84,45 @@ class Mesh:
             RGB color triplet. color in [0, 255].
         """
         self.color = color
+        self._per_vertex_color = False
         color = [c/255 for c in color]
         self.mesh.paint_uniform_color(color)
 
+    def set_vertex_colors(self, colors):
+        """Colors each vertex individually. Kept across `update`.
+
+        Arguments
+        ---------
+        colors : np.ndarray of shape (N, 3)
+            RGB color of each vertex in [0, 1].
+        """
+        if not o3d_color.write_colors(self.mesh.vertex_colors, colors):
+            self.mesh.vertex_colors = o3d.utility.Vector3dVector(
+                np.asarray(colors, dtype=np.float64))
+        self._per_vertex_color = True
+
+    def set_scalar_field(self, values, vmin=None, vmax=None, cmap="jet"):
+        """Colors vertices by mapping a scalar per vertex through a colormap.
+
+        Arguments
+        ---------
+        values : np.ndarray of shape (N,)
+            Scalar value at each vertex, e.g. error.
+
+        vmin, vmax : float
+            Values mapped to the ends of colormap. Defaults to min and max.
+
+        cmap : string
+            Name of matplotlib colormap.
+        """
+        buffer = np.asarray(self.mesh.vertex_colors)
+        if buffer.shape == (len(values), 3):
+            o3d_color.scalar_to_colors(values, vmin, vmax, cmap, out=buffer)
+            self._per_vertex_color = True
+        else:
+            self.set_vertex_colors(
+                o3d_color.scalar_to_colors(values, vmin, vmax, cmap))
+
     def write(self, path):
         """Writes mesh to file as vertices and faces.
 
@@ -1,18 +1,47 @@
+import resource
+import time
+from contextlib import contextmanager
 import open3d as o3d
 import numpy as np
-import tensorflow as tf
+from scipy.spatial import cKDTree
+from common_utilities.instance import tf2np
+from . import color as o3d_color
+from . import tiling
+from common_utilities.profiling import profile
 
 
 class PointCloud:
     """Point Cloud wrapper for open3d.PointCloud.
 
+    Points, normals and colors are kept as contiguous float32 arrays and
+    modified in place. The `open3d` object is only written when accessed.
+
     Attributes
     ----------
+    pts : np.ndarray of shape (n_points, 3)
+        3D coordinates of points.
+
+    normals : np.ndarray of shape (n_points, 3) or None
+        Normal at each point.
+
+    colors : np.ndarray of shape (n_points, 3)
+        RGB color of each point in [0, 1].
+
     pcd : `open3d.geometry.PointCloud`
-        Point cloud object as per `open3d`.
+        Point cloud object as per `open3d`. Synced with arrays on access.
 
     color : array_like of shape (3,)
         RGB color triplet. color in [0, 255].
+
+    kdtree : `scipy.spatial.cKDTree`
+        KD-tree over points. Built lazily on first query and invalidated
+        whenever points change.
+
+    stats : dict
+        Time in seconds, number of points and memory of the last run of each
+        processing stage, keyed by stage name. Memory is the resident memory
+        in KiB of this process before and after the stage and, in tiled
+        mode, the peak resident memory of the largest worker process.
     """
 
     def __init__(self, pts=None, color=[255, 0, 0]):
@@ -26,21 +55,49 @@ class PointCloud:
         color : array_like of shape (3,)
             RGB color triplet. color in [0, 255].
         """
-        if isinstance(pts, tf.Tensor):
-            pts = pts.numpy()
+        self._pcd = o3d.geometry.PointCloud()
+        self._stale = True
+        self._kdtree = None
+        self.stats = {}
 
-        self.pcd = o3d.geometry.PointCloud()
+        self.pts = np.zeros((0, 3), dtype=np.float32)
+        self.normals = None
         self.color = color
+        self.set_color(color)
 
         if pts is not None:
             self.update(pts)
 
+    @property
+    def pcd(self):
+        """Returns `open3d` point cloud, writing pending changes to it."""
+        if self._stale:
+            self._write_buffer("points", self.pts)
+            self._write_buffer("normals", self.normals)
+            self._write_buffer("colors", self.colors)
+            self._stale = False
+        return self._pcd
+
+    def _write_buffer(self, name, array):
+        """Copies `array` into `open3d` buffer, reusing it if sizes match."""
+        if array is None:
+            setattr(self._pcd, name, o3d.utility.Vector3dVector())
+            return
+
+        buffer = np.asarray(getattr(self._pcd, name))
+        if buffer.shape == array.shape:
+            buffer[:] = array
+        else:
+            setattr(self._pcd, name,
+                    o3d.utility.Vector3dVector(array.astype(np.float64)))
+
     def set_normals(self, normals):
-        if isinstance(normals, tf.Tensor):
-            normals = normals.numpy()
+        normals = tf2np(normals)
 
-        self.pcd.normals = o3d.utility.Vector3dVector(normals)
+        self.normals = np.array(normals, dtype=np.float32)
+        self._stale = True
 
+    @profile
     def update(self, pts):
         """Updates location of points.
 
@@ -49,11 +106,16 @@ class PointCloud:
         pts : np.ndarray of shape(n_points, 3)
             3D coordinates of points in point cloud.
         """
-        if isinstance(pts, tf.Tensor):
-            pts = pts.numpy()
+        pts = tf2np(pts)
 
-        self.pcd.points = o3d.utility.Vector3dVector(pts)
-        self.set_color(self.color)
+        if np.shape(pts) == self.pts.shape:
+            self.pts[:] = pts
+        else:
+            self.pts = np.array(pts, dtype=np.float32)
+            self.normals = None
+            self.set_color(self.color)
+        self._kdtree = None
+        self._stale = True
 
     def set_color(self, color):
         """Color point cloud.
@@ -64,9 +126,39 @@ class PointCloud:
             RGB color triplet. color in [0, 255].
         """
         self.color = color
-        color = [c/255 for c in color]
-        self.pcd.paint_uniform_color(color)
+        self.colors = np.empty((len(self.pts), 3), dtype=np.float32)
+        self.colors[:] = np.asarray(color, dtype=np.float32) / 255
+        self._stale = True
+
+    def set_point_colors(self, colors):
+        """Colors each point individually.
+
+        Arguments
+        ---------
+        colors : np.ndarray of shape (n_points, 3)
+            RGB color of each point in [0, 1].
+        """
+        self.colors[:] = colors
+        self._stale = True
+
+    def set_scalar_field(self, values, vmin=None, vmax=None, cmap="jet"):
+        """Colors points by mapping a scalar per point through a colormap.
+
+        Arguments
+        ---------
+        values : np.ndarray of shape (n_points,)
+            Scalar value at each point, e.g. error.
+
+        vmin, vmax : float
+            Values mapped to the ends of colormap. Defaults to min and max.
 
+        cmap : string
+            Name of matplotlib colormap.
+        """
+        o3d_color.scalar_to_colors(values, vmin, vmax, cmap, out=self.colors)
+        self._stale = True
+
+    @profile
     def crop(self, min_bound, max_bound):
         """Crops point cloud.
 
@@ -78,8 +170,9 @@ class PointCloud:
         max_bound : np.array of shape (3,)
             Coordinates for maximum clipping.
         """
-        self.pcd = o3d.geometry.crop_point_cloud(
-            self.pcd, min_bound, max_bound)
+        mask = np.all(
+            (self.pts >= min_bound) & (self.pts <= max_bound), axis=1)
+        self._select(mask)
 
     def recenter(self, center=None):
         """Subtract `center` from all points.
@@ -89,15 +182,52 @@ class PointCloud:
         center : np.array of shape (3,)
             Subtract this coordinate from all points.
         """
-        pts = np.asarray(self.pcd.points)
-
         if center is None:
-            center = np.mean(pts, axis=0)
+            center = np.mean(self.pts, axis=0)
+
+        self.pts -= np.asarray(center, dtype=np.float32)
+        self._kdtree = None
+        self._stale = True
+
+    @profile
+    def transform(self, transformation):
+        """Applies rigid transformation to points and normals in place.
+
+        Arguments
+        ---------
+        transformation : np.ndarray of shape (4, 4)
+            Homogeneous transformation matrix.
+        """
+        transformation = np.asarray(transformation, dtype=np.float32)
+        rot, trans = transformation[:3, :3], transformation[:3, 3]
+
+        self.pts[:] = self.pts @ rot.T + trans
+        if self.normals is not None:
+            self.normals[:] = self.normals @ rot.T
+        self._kdtree = None
+        self._stale = True
 
-        pts -= center
-        self.update(pts)
+    @profile
+    def voxel_downsample(self, voxel_size):
+        """Replaces points in each voxel by their average.
 
-    def remove_outliers(self, n_pts=20, radius=15):
+        Arguments
+        ---------
+        voxel_size : float
+            Edge length of voxel in mm.
+        """
+        with self._stage("voxel_downsample"):
+            pcd = self.pcd.voxel_down_sample(voxel_size)
+            self.pts = np.asarray(pcd.points, dtype=np.float32)
+            self.colors = np.asarray(pcd.colors, dtype=np.float32)
+            self.normals = np.asarray(pcd.normals, dtype=np.float32) \
+                if pcd.has_normals() else None
+            self._kdtree = None
+            self._stale = True
+
+    @profile
+    def remove_outliers(self, n_pts=20, radius=15,
+                        tile_size=None, n_workers=None):
         """Removes outliers from point cloud.
 
         Arguments
@@ -106,11 +236,203 @@ class PointCloud:
             Threshold on number of points in neighbour.
         radius : float
             Radius of neighbourhood in mm.
+        tile_size : float
+            If given, processes cloud in tiles of this edge length in mm
+            using a process pool. Tiles overlap by `radius`.
+        n_workers : int
+            Number of worker processes for tiled mode. `None` uses all cores.
+        """
+        with self._stage("remove_outliers") as stage:
+            if tile_size is None:
+                mask = tiling.radius_outlier_mask(self.pts, n_pts, radius)
+            else:
+                mask = tiling.process_tiles(
+                    self.pts, tiling.radius_outlier_mask,
+                    tile_size, radius, n_workers, stats=stage,
+                    n_pts=n_pts, radius=radius
+                )
+            self._select(mask)
+
+    @profile
+    def remove_statistical_outliers(self, n_neighbors=20, std_ratio=2.0,
+                                    tile_size=None, margin=None,
+                                    n_workers=None):
+        """Removes points far from their neighbours compared to the average.
+
+        Arguments
+        ---------
+        n_neighbors : int
+            Number of neighbours used to compute mean distance of a point.
+        std_ratio : float
+            Points whose mean distance exceeds the average by `std_ratio`
+            standard deviations are removed.
+        tile_size : float
+            If given, processes cloud in tiles of this edge length in mm
+            using a process pool.
+        margin : float
+            Overlap between tiles in mm. Should cover the distance to the
+            `n_neighbors` nearest neighbours. Defaults to `tile_size / 10`.
+        n_workers : int
+            Number of worker processes for tiled mode. `None` uses all cores.
+
+        Note: in tiled mode the distance statistics are computed per tile.
+        """
+        with self._stage("remove_statistical_outliers") as stage:
+            if tile_size is None:
+                mask = tiling.statistical_outlier_mask(
+                    self.pts, n_neighbors, std_ratio)
+            else:
+                if margin is None:
+                    margin = tile_size / 10
+                mask = tiling.process_tiles(
+                    self.pts, tiling.statistical_outlier_mask,
+                    tile_size, margin, n_workers, stats=stage,
+                    n_neighbors=n_neighbors, std_ratio=std_ratio
+                )
+            self._select(mask)
+
+    @profile
+    def estimate_normals(self, radius=None, max_nn=30,
+                         tile_size=None, margin=None, n_workers=None):
+        """Estimates normals oriented towards camera at origin.
+
+        Arguments
+        ---------
+        radius : float
+            Radius of neighbourhood in mm. `None` uses `max_nn` nearest
+            neighbours irrespective of distance.
+        max_nn : int
+            Maximum number of neighbours.
+        tile_size : float
+            If given, processes cloud in tiles of this edge length in mm
+            using a process pool.
+        margin : float
+            Overlap between tiles in mm. Defaults to `radius` if given,
+            else `tile_size / 10`.
+        n_workers : int
+            Number of worker processes for tiled mode. `None` uses all cores.
+
+        Returns
+        -------
+        normals : np.ndarray of shape (n_points, 3)
+            Estimated normals.
+        """
+        with self._stage("estimate_normals") as stage:
+            if tile_size is None:
+                normals = tiling.normals(self.pts, radius, max_nn)
+            else:
+                if margin is None:
+                    margin = tile_size / 10 if radius is None else radius
+                normals = tiling.process_tiles(
+                    self.pts, tiling.normals,
+                    tile_size, margin, n_workers, stats=stage,
+                    radius=radius, max_nn=max_nn
+                )
+            self.set_normals(normals)
+
+        return self.normals.copy()
+
+    def _select(self, mask):
+        """Keeps only points where `mask` is True."""
+        self.pts = self.pts[mask]
+        self.colors = self.colors[mask]
+        if self.normals is not None:
+            self.normals = self.normals[mask]
+        self._kdtree = None
+        self._stale = True
+
+    @contextmanager
+    def _stage(self, name):
+        """Records time and memory of a processing stage in `self.stats`.
+
+        Yields dict of extra stats of the stage, e.g. worker memory.
+        """
+        stage = {
+            "n_pts_in": len(self.pts),
+            "rss_before": _current_rss(),
+            "max_rss_workers": None,
+        }
+        time_start = time.perf_counter()
+        yield stage
+        stage["time"] = time.perf_counter() - time_start
+        stage["n_pts_out"] = len(self.pts)
+        stage["rss_after"] = _current_rss()
+        self.stats[name] = stage
+
+    @property
+    def kdtree(self):
+        """Returns cached KD-tree over points, building it if required."""
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self.pts)
+        return self._kdtree
+
+    @profile
+    def query_knn(self, query, k=1, workers=1):
+        """Finds `k` nearest points for each query point.
+
+        Arguments
+        ---------
+        query : np.ndarray of shape (n_query, 3)
+            Query coordinates.
+
+        k : int
+            Number of neighbours per query point.
+
+        workers : int
+            Number of parallel workers. -1 uses all cores.
+
+        Returns
+        -------
+        dists : np.ndarray of shape (n_query, k)
+            Euclidean distance to each neighbour, sorted in ascending order.
+
+        ids : np.ndarray of shape (n_query, k)
+            Index of each neighbour in point cloud.
+        """
+        query = tf2np(query)
+
+        # list of k keeps the neighbour axis even for k=1
+        dists, ids = self.kdtree.query(query, k=np.arange(1, k+1),
+                                       workers=workers)
+
+        return dists, ids
+
+    @profile
+    def query_radius(self, query, radius, workers=1):
+        """Finds all points within `radius` of each query point.
+
+        Arguments
+        ---------
+        query : np.ndarray of shape (n_query, 3)
+            Query coordinates.
+
+        radius : float
+            Radius of neighbourhood in mm.
+
+        workers : int
+            Number of parallel workers. -1 uses all cores.
+
+        Returns
+        -------
+        ids : list of np.ndarray
+            Sorted indices of neighbours for each query point.
         """
-        self.pcd, inds = self.pcd.remove_radius_outlier(n_pts, radius)
+        query = tf2np(query)
+
+        ids = self.kdtree.query_ball_point(query, radius, workers=workers,
+                                           return_sorted=True)
+
+        return [np.asarray(ids_query, dtype=np.int64) for ids_query in ids]
+
 
-    def estimate_normals(self):
-        self.pcd.estimate_normals()
-        self.pcd.orient_normals_towards_camera_location()
+def _current_rss():
+    """Returns current resident memory of this process in KiB, None if not
+    available. `ru_maxrss` is a lifetime peak, so it can not be used per
+    stage."""
+    try:
+        with open("/proc/self/statm") as file:
+            n_pages = int(file.read().split()[1])
+    except OSError:
+        return None
 
-        return np.asarray(self.pcd.normals).astype(np.float32)
+    return n_pages * resource.getpagesize() // 1024
@@ -0,0 +1,97 @@
+import numpy as np
+from common_utilities.instance import tf2np
+from .lineset import Lineset
+from common_utilities.profiling import profile
+
+
+def parents_to_bones(parents):
+    """Returns bones of kinematic tree as (parent, child) joint pairs.
+
+    Arguments
+    ---------
+    parents : array_like of shape (n_joints,)
+        Index of parent of each joint. Root joints have a negative parent.
+
+    Returns
+    -------
+    bones : np.ndarray of shape (n_bones, 2)
+    """
+    parents = np.asarray(parents)
+    assert parents.ndim == 1, "parents must be of shape (n_joints,)"
+    assert np.all(parents < len(parents)), "parent index out of range"
+
+    ids_child = np.nonzero(parents >= 0)[0]
+    return np.stack([parents[ids_child], ids_child], axis=-1)
+
+
+class SkeletonLineset(Lineset):
+    """Many skeletons sharing the same kinematic tree merged into one
+    `Lineset`.
+
+    Bones of skeleton `i` index joints offset by `i * n_joints`, so all
+    skeletons are uploaded and updated as a single geometry.
+
+    Attributes
+    ----------
+    n_skeletons : int
+        Number of skeletons.
+
+    n_joints : int
+        Number of joints in each skeleton.
+
+    bones : np.ndarray of shape (n_bones, 2)
+        (parent, child) joint indices of each bone of one skeleton.
+    """
+
+    def __init__(self, joints, parents, color=[255, 0, 0]):
+        """Creates merged lineset of all skeletons.
+
+        Arguments
+        ---------
+        joints : np.ndarray of shape (B, n_joints, 3) or (n_joints, 3)
+            Joint positions of each skeleton.
+
+        parents : array_like of shape (n_joints,)
+            Index of parent of each joint. Root joints have a negative parent.
+
+        color : array_like of shape (3,)
+            RGB color of lines.
+        """
+        joints = tf2np(joints)
+        if np.ndim(joints) == 2:
+            joints = joints[np.newaxis]
+
+        self.n_skeletons, self.n_joints = joints.shape[:2]
+        assert len(parents) == self.n_joints, \
+            "parents must have an entry for every joint"
+        self.bones = parents_to_bones(parents)
+
+        offsets = np.arange(self.n_skeletons)[:, np.newaxis, np.newaxis] \
+            * self.n_joints
+        lines = np.reshape(self.bones[np.newaxis] + offsets, [-1, 2])
+
+        super().__init__(np.reshape(joints, [-1, 3]), lines, color)
+
+    @profile
+    def update(self, joints):
+        """Updates joints of all skeletons with a single buffer write.
+
+        Arguments
+        ---------
+        joints : np.ndarray of shape (B, n_joints, 3) or (n_joints, 3)
+            Updated joint positions of each skeleton.
+        """
+        joints = tf2np(joints)
+        super().update(np.reshape(joints, [-1, 3]))
+
+    def set_bone_colors(self, colors):
+        """Colors bones, shared by all skeletons or per skeleton.
+
+        Arguments
+        ---------
+        colors : np.ndarray of shape (n_bones, 3) or (B, n_bones, 3)
+            RGB color of each bone.
+        """
+        colors = np.broadcast_to(
+            colors, [self.n_skeletons, len(self.bones), 3])
+        self.set_line_colors(np.reshape(colors, [-1, 3]))
@@ -0,0 +1,205 @@
+import itertools
+import multiprocessing
+import os
+import resource
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import open3d as o3d
+
+
+def split_tiles(pts, tile_size, margin):
+    """Splits points spatially into cubic tiles with overlapping margins.
+
+    Arguments
+    ---------
+    pts : np.ndarray of shape (n_points, 3)
+        3D coordinates of points.
+
+    tile_size : float
+        Edge length of each tile.
+
+    margin : float
+        Width of overlap around each tile. Must not exceed `tile_size`.
+
+    Returns
+    -------
+    tiles : list of tuple (ids_core, ids_tile)
+        `ids_core` are indices of points owned by the tile. `ids_tile` are
+        indices of all points within the tile and its margin, starting with
+        `ids_core`.
+    """
+    assert margin <= tile_size, "Margin must not exceed tile size."
+    if len(pts) == 0:
+        return []
+
+    origin = np.min(pts, axis=0)
+    keys = np.floor((pts - origin) / tile_size).astype(np.int64)
+    keys_unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # group point indices by tile
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse))[:-1]
+    ids_per_tile = np.split(order, splits)
+    tile_of_key = {tuple(key): idx for idx, key in enumerate(keys_unique)}
+
+    tiles = []
+    for key, ids_core in zip(keys_unique, ids_per_tile):
+        # margin points can only come from the 26 adjacent tiles
+        ids_adjacent = [
+            ids_per_tile[tile_of_key[tuple(key + offset)]]
+            for offset in itertools.product([-1, 0, 1], repeat=3)
+            if any(offset) and tuple(key + offset) in tile_of_key
+        ]
+        if ids_adjacent:
+            ids_adjacent = np.concatenate(ids_adjacent)
+            lo = origin + key * tile_size - margin
+            hi = origin + (key + 1) * tile_size + margin
+            pts_adjacent = pts[ids_adjacent]
+            inside = np.all((pts_adjacent >= lo) & (pts_adjacent < hi), axis=1)
+            ids_tile = np.concatenate([ids_core, ids_adjacent[inside]])
+        else:
+            ids_tile = ids_core
+        tiles.append((ids_core, ids_tile))
+
+    return tiles
+
+
+def process_tiles(pts, fn, tile_size, margin, n_workers=None, stats=None,
+                  **kwargs):
+    """Applies per-point function `fn` tile by tile in a process pool.
+
+    Each tile is processed together with its margin so that neighbourhood
+    based operations see the same neighbours as on the whole cloud. Only the
+    results of points owned by a tile are kept while stitching.
+
+    Arguments
+    ---------
+    pts : np.ndarray of shape (n_points, 3)
+        3D coordinates of points.
+
+    fn : callable
+        Module level function `fn(pts_tile, **kwargs)` returning an array
+        with one entry per point of `pts_tile`.
+
+    tile_size : float
+        Edge length of each tile.
+
+    margin : float
+        Width of overlap around each tile.
+
+    n_workers : int
+        Number of worker processes. `None` uses all cores, 1 runs inline.
+        Workers are started from a fork server, not forked from the caller,
+        so `fn` must be importable by the workers.
+
+    stats : dict
+        If given, `max_rss_workers` is set to the largest peak resident
+        memory in KiB of any worker process. Workers are started for this
+        call only, so the peak covers this call. Not set when run inline.
+
+    Returns
+    -------
+    out : np.ndarray of shape (n_points, ...)
+        Stitched output of `fn` for every point.
+    """
+    fn = partial(fn, **kwargs)
+    if len(pts) == 0:
+        return fn(pts)
+
+    tiles = split_tiles(pts, tile_size, margin)
+    pts_tiles = (pts[ids_tile] for _, ids_tile in tiles)
+
+    if n_workers == 1:
+        return _stitch(tiles, map(fn, pts_tiles), len(pts))
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    # forking a process running tensorflow or open3d threads can deadlock
+    method = "forkserver" \
+        if "forkserver" in multiprocessing.get_all_start_methods() \
+        else "spawn"
+    max_rss = []
+    with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(method)) as executor:
+        results = _map_bounded(executor, partial(_run_measured, fn),
+                               pts_tiles, 2 * n_workers)
+        out = _stitch(tiles, results, len(pts), max_rss)
+    if stats is not None:
+        stats["max_rss_workers"] = max(max_rss)
+
+    return out
+
+
+def _map_bounded(executor, fn, items, n_in_flight):
+    """Like `executor.map`, but only takes the next item from `items` when
+    fewer than `n_in_flight` are submitted, so that tiles are copied for
+    the workers as they are needed, not all upfront."""
+    futures = deque()
+    for item in items:
+        futures.append(executor.submit(fn, item))
+        if len(futures) >= n_in_flight:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
+
+
+def _run_measured(fn, pts):
+    """Runs `fn` in worker, returning result and peak memory of worker."""
+    result = fn(pts)
+    return result, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _stitch(tiles, results, n_points, max_rss=None):
+    """Writes results of owned points of each tile into one array. Results
+    are (result, max_rss) pairs if `max_rss` list is given."""
+    out = None
+    for (ids_core, _), result in zip(tiles, results):
+        if max_rss is not None:
+            result, rss = result
+            max_rss.append(rss)
+        if out is None:
+            out = np.empty((n_points, *result.shape[1:]), dtype=result.dtype)
+        out[ids_core] = result[:len(ids_core)]
+
+    return out
+
+
+def radius_outlier_mask(pts, n_pts, radius):
+    """Returns mask of points with at least `n_pts` neighbours in `radius`."""
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(pts))
+    _, inds = pcd.remove_radius_outlier(n_pts, radius)
+    mask = np.zeros(len(pts), dtype=bool)
+    mask[inds] = True
+
+    return mask
+
+
+def statistical_outlier_mask(pts, n_neighbors, std_ratio):
+    """Returns mask of points whose mean neighbour distance is within
+    `std_ratio` standard deviations of the average."""
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(pts))
+    _, inds = pcd.remove_statistical_outlier(n_neighbors, std_ratio)
+    mask = np.zeros(len(pts), dtype=bool)
+    mask[inds] = True
+
+    return mask
+
+
+def normals(pts, radius=None, max_nn=30):
+    """Returns normals oriented towards origin estimated from neighbourhood.
+
+    Uses `max_nn` nearest neighbours, restricted to `radius` if given.
+    """
+    pcd = o3d.geometry.PointCloud(o3d.utility.Vector3dVector(pts))
+    if radius is None:
+        search_param = o3d.geometry.KDTreeSearchParamKNN(max_nn)
+    else:
+        search_param = o3d.geometry.KDTreeSearchParamHybrid(radius, max_nn)
+    pcd.estimate_normals(search_param)
+    pcd.orient_normals_towards_camera_location()
+
+    return np.asarray(pcd.normals)
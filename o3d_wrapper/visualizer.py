@@ -1,6 +1,7 @@
 import os
 import numpy as np
 import open3d as o3d
+from common_utilities.profiling import profile
 
 
 class Visualizer:
@@ -48,6 +49,9 @@ class Visualizer:
         self.cx, self.cy = width/2 - 0.5, height/2 - 0.5,
         self.pos_cam = pos_cam
 
+        # camera view is set once before next render instead of per geometry
+        self._view_pending = False
+
     def create_window(self, window_name, width, height, left, top):
         cwd = os.getcwd()  # to handle issue on Mac
         self.vis.create_window(
@@ -87,6 +91,12 @@ class Visualizer:
         view_control.convert_from_pinhole_camera_parameters(
             pinhole_camera_parameters
         )
+        self._view_pending = False
+
+    def _apply_pending_view(self):
+        """Sets camera view if geometries were added since last render."""
+        if self._view_pending:
+            self.set_view()
 
     def add_mesh(self, mesh):
         """Add a mesh to the visualizer.
@@ -94,9 +104,11 @@ class Visualizer:
         Arguments
         ---------
         mesh : `lib.o3d_wrapper.Mesh` object
+            Use `lib.o3d_wrapper.InstancedMesh` to add many meshes sharing
+            topology as a single geometry.
         """
         self.vis.add_geometry(mesh.mesh)
-        self.set_view()
+        self._view_pending = True
 
     def add_pcd(self, pc):
         """Add a pcd to the visualizer.
@@ -106,7 +118,7 @@ class Visualizer:
         pc : `lib.o3d_wrapper.PointCloud` object
         """
         self.vis.add_geometry(pc.pcd)
-        self.set_view()
+        self._view_pending = True
 
     def add_lineset(self, lineset):
         """Add lineset to visualizer.
@@ -116,7 +128,7 @@ class Visualizer:
         lineset : `lib.o3d_wrapper.Lineset` object.
         """
         self.vis.add_geometry(lineset.lineset)
-        self.set_view()
+        self._view_pending = True
 
     def show_frame(self, pos=np.array([0, 0, 0]), scale=100):
         """Adds a coordinate frame in visualizer."""
@@ -124,14 +136,16 @@ class Visualizer:
             size=scale, origin=pos
         )
         self.vis.add_geometry(frame)
-        self.set_view()
+        self._view_pending = True
 
+    @profile
     def update(self, geometries):
         if not isinstance(geometries, list):
             geometries = [geometries]
 
         [self.vis.update_geometry(geometry) for geometry in geometries]
 
+    @profile
     def show(self):
         """Updates geometries in visualizer.
 
@@ -140,6 +154,7 @@ class Visualizer:
         open_window : bool
             `False` if window is to be closed.
         """
+        self._apply_pending_view()
         open_window = self.vis.poll_events()
 
         return open_window
@@ -152,7 +167,10 @@ class Visualizer:
     def reset_view(self):
         """Resets view point. Useful after adding new geometries."""
         self.vis.reset_view_point(True)
+        # keep reset view instead of applying fixed view on next show
+        self._view_pending = False
 
+    @profile
     def depth_buffer(self):
         """Returns depth buffer.
 
@@ -161,11 +179,13 @@ class Visualizer:
         depth : np.ndarray of shape (self.height, self.width)
             Depth buffer of vis.
         """
+        self._apply_pending_view()
         depth = self.vis.capture_depth_float_buffer(True)
         depth = np.asarray(depth)
 
         return depth
 
+    @profile
     def screen_buffer(self):
         """Returns screen buffer.
 
@@ -174,6 +194,7 @@ class Visualizer:
         img : np.ndarray of shape (self.height, self.width)
             Screen buffer of vis.
         """
+        self._apply_pending_view()
         img = self.vis.capture_screen_float_buffer(True)
         img = np.asarray(img)
         img = (img * 255).astype(np.uint8)
@@ -181,6 +202,7 @@ class Visualizer:
         return img
 
     def get_cam(self):
+        self._apply_pending_view()
         pinhole_camera_parameters = \
             self.vis.convert_to_pinhole_camera_parameters()
         camera_intrinsic = pinhole_camera_parameters.intrinsic
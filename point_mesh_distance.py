@@ -0,0 +1,387 @@
+import numpy as np
+import tensorflow as tf
+from scipy.spatial import cKDTree
+from common_utilities.compiled import FOLLOW, CompiledFunction
+from common_utilities.instance import tf2np
+from common_utilities.profiling import profile
+
+
+class PointMeshDistance:
+    """Exact point to triangle mesh distance with KD-trees over triangles.
+
+    Triangles are bounded by spheres around their centroids and grouped by
+    size into buckets whose radii differ by less than a factor of 2. Each
+    bucket keeps a KD-tree over its centroids. For each query point nearest
+    centroids of a bucket are visited in increasing order until the next
+    centroid is farther than the best exact distance found plus the largest
+    radius in the bucket. No other triangle can then be closer, so the
+    result is exact without comparing every point to every triangle, and a
+    few large triangles do not loosen the bound for all others.
+
+    Attributes
+    ----------
+    verts : np.ndarray of shape (n_verts, 3)
+        Position of mesh vertices.
+
+    triangles : np.ndarray of shape (n_triangles, 3)
+        Indices of vertices that make up the triangle.
+
+    kdtrees : list of `scipy.spatial.cKDTree`
+        Tree over triangle centroids of each bucket. Built lazily and cached
+        until `update`.
+    """
+
+    def __init__(self, verts, triangles):
+        """Creates distance engine for given mesh.
+
+        Arguments
+        ---------
+        verts : np.ndarray of shape (n_verts, 3)
+            Position of mesh vertices.
+
+        triangles : np.ndarray of shape (n_triangles, 3)
+            Indices of vertices that make up the triangle.
+        """
+        verts, triangles = tf2np((verts, triangles))
+        self.triangles = np.asarray(triangles, dtype=np.int32)
+        assert self.triangles.ndim == 2 and self.triangles.shape[1] == 3, \
+            "triangles must be of shape (n_triangles, 3)"
+        self.update(verts)
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Creates distance engine for `o3d_wrapper.Mesh`."""
+        return cls(mesh.get_verts(), mesh.get_triangles())
+
+    def update(self, verts):
+        """Updates vertices of mesh with unchanged topology.
+
+        Arguments
+        ---------
+        verts : np.ndarray of shape (n_verts, 3)
+            Position of mesh vertices.
+        """
+        verts = np.asarray(tf2np(verts))
+        self.verts = verts if np.issubdtype(verts.dtype, np.floating) \
+            else verts.astype(np.float32)
+
+        # search runs in float64 so that near ties and pruning are not
+        # affected by rounding
+        corners = self.verts[self.triangles].astype(np.float64)
+        self._corner_a = corners[:, 0]
+        self._ab = corners[:, 1] - corners[:, 0]
+        self._ac = corners[:, 2] - corners[:, 0]
+        self._dots = np.stack([
+            _dot_np(self._ab, self._ab), _dot_np(self._ab, self._ac),
+            _dot_np(self._ac, self._ac)], axis=-1)
+
+        self._centroids = np.mean(corners, axis=1)
+        radius = np.max(np.linalg.norm(
+            corners - self._centroids[:, np.newaxis], axis=-1), axis=-1)
+        self._buckets = _size_buckets(radius)
+        self._kdtrees = None
+
+    @property
+    def kdtrees(self):
+        """Returns cached KD-trees over centroids of each bucket, building
+        them if required."""
+        if self._kdtrees is None:
+            self._kdtrees = [cKDTree(self._centroids[ids])
+                             for ids, _ in self._buckets]
+        return self._kdtrees
+
+    @profile
+    def query(self, points, k=8, workers=1, max_pairs=2**20):
+        """Finds closest point on mesh surface for each query point.
+
+        Arguments
+        ---------
+        points : np.ndarray of shape (n_points, 3)
+            Query coordinates.
+
+        k : int
+            Number of triangles of a bucket visited per point in the first
+            round. Points whose closest triangle is not certified yet visit
+            twice as many triangles in each following round.
+
+        workers : int
+            Number of parallel workers for KD-tree queries. -1 uses all cores.
+
+        max_pairs : int
+            Maximum number of point and triangle pairs evaluated at once,
+            bounds memory use.
+
+        Returns
+        -------
+        dists : np.ndarray of shape (n_points,)
+            Euclidean distance to mesh surface.
+
+        ids_triangle : np.ndarray of shape (n_points,)
+            Index of closest triangle.
+
+        coords : np.ndarray of shape (n_points, 2)
+            Barycentric coordinates of closest point, as used by
+            `barycentric_mesh_sampling.dense_sample`.
+        """
+        points = np.asarray(tf2np(points))
+        assert points.ndim == 2 and points.shape[1] == 3, \
+            "points must be of shape (n_points, 3)"
+        assert len(self.triangles), "mesh has no triangles"
+
+        n_points = len(points)
+        best_sq = np.full(n_points, np.inf)
+        ids_triangle = np.zeros(n_points, dtype=np.int32)
+        weights = np.zeros([n_points, 2])
+
+        # largest bucket first, its distances prune the other buckets
+        for (ids_bucket, radius), kdtree in zip(self._buckets, self.kdtrees):
+            n_bucket = len(ids_bucket)
+            ids_open = np.arange(n_points)
+            k_done, k_bucket = 0, min(max(k, 1), n_bucket)
+            while len(ids_open):
+                batch_size = max(max_pairs // (k_bucket - k_done), 1)
+                bounds = []
+                for start in range(0, len(ids_open), batch_size):
+                    ids_batch = ids_open[start:start + batch_size]
+                    bounds.append(self._visit(
+                        points[ids_batch], ids_batch, kdtree, ids_bucket,
+                        radius, k_done, k_bucket, workers,
+                        best_sq, ids_triangle, weights))
+
+                if k_bucket == n_bucket:
+                    break
+
+                # unvisited triangles of bucket are at least `bound` away
+                bound = np.maximum(np.concatenate(bounds) - radius, 0)
+                ids_open = ids_open[bound**2 < best_sq[ids_open]]
+                k_done, k_bucket = k_bucket, min(2 * k_bucket, n_bucket)
+
+        dtype = self.verts.dtype
+        weights = np.concatenate([1 - np.sum(weights, axis=1, keepdims=True),
+                                  weights], axis=1)
+
+        return np.sqrt(best_sq).astype(dtype), ids_triangle, \
+            weights_to_coords(weights).astype(dtype)
+
+    def _visit(self, points, ids_points, kdtree, ids_bucket, radius,
+               k_done, k, workers, best_sq, best_ids, best_weights):
+        """Evaluates triangles of bucket with centroids ranked `k_done + 1`
+        to `k` and keeps the closest in `best_*`. Returns distance of
+        farthest visited centroid for each point."""
+        dists_centroid, ids_local = kdtree.query(
+            points, k=np.arange(k_done + 1, k + 1), workers=workers)
+
+        # skip points that no triangle of this round can get closer to
+        lower = np.maximum(dists_centroid[:, 0] - radius, 0)
+        active = lower**2 < best_sq[ids_points]
+        if not np.any(active):
+            return dists_centroid[:, -1]
+        points, ids_points = points[active], ids_points[active]
+        ids_candidate = ids_bucket[ids_local[active]]
+
+        # only two dot products per pair, rest is per triangle
+        ap = points[:, np.newaxis] - self._corner_a[ids_candidate]
+        d1 = _dot_np(self._ab[ids_candidate], ap)
+        d2 = _dot_np(self._ac[ids_candidate], ap)
+        dots = self._dots[ids_candidate]
+        v, w = _closest_point_vw(d1, d2, dots[..., 0], dots[..., 1],
+                                 dots[..., 2])
+
+        # |ap - v * ab - w * ac|^2 expanded
+        dists_sq = _dot_np(ap, ap) - 2 * (v * d1 + w * d2) \
+            + v * v * dots[..., 0] + 2 * v * w * dots[..., 1] \
+            + w * w * dots[..., 2]
+
+        ids_min = np.argmin(dists_sq, axis=1)
+        rows = np.arange(len(points))
+        min_sq = np.maximum(dists_sq[rows, ids_min], 0)
+
+        better = min_sq < best_sq[ids_points]
+        ids_better = ids_points[better]
+        best_sq[ids_better] = min_sq[better]
+        best_ids[ids_better] = ids_candidate[rows, ids_min][better]
+        best_weights[ids_better] = np.stack(
+            [v[rows, ids_min], w[rows, ids_min]], axis=-1)[better]
+
+        return dists_centroid[:, -1]
+
+
+def _size_buckets(radius, min_level=-2):
+    """Groups triangles by bounding radius into octaves centred on the
+    median radius, so that regular meshes form a single bucket.
+
+    Triangles smaller than `2**min_level` times the median share the lowest
+    bucket, so slivers do not create many tiny buckets.
+
+    Returns
+    -------
+    buckets : list of tuple (ids_triangle, max_radius)
+        Sorted by decreasing number of triangles.
+    """
+    scale = np.median(radius) if len(radius) else 0.
+    if scale > 0:
+        levels = np.round(np.log2(
+            np.maximum(radius / scale, 2.**min_level))).astype(np.int64)
+    else:
+        levels = np.zeros(len(radius), dtype=np.int64)
+
+    buckets = []
+    for level in np.unique(levels):
+        ids = np.nonzero(levels == level)[0].astype(np.int32)
+        buckets.append((ids, np.max(radius[ids])))
+    buckets.sort(key=lambda bucket: -len(bucket[0]))
+
+    return buckets
+
+
+def closest_point_weights(p, a, b, c, xp=np):
+    """Barycentric weights of closest point on triangle `abc` to `p`.
+
+    Arguments
+    ---------
+    p, a, b, c : array of shape (..., 3)
+        Query point and triangle corners, broadcastable against each other.
+
+    xp : module
+        `np` for NumPy arrays or `tf` for tensors.
+
+    Returns
+    -------
+    weights : array of shape (..., 3)
+        Weights of corners `a`, `b` and `c`, summing to 1.
+    """
+    dot = _dot_tf if xp is tf else _dot_np
+    ab, ac, ap = b - a, c - a, p - a
+    v, w = _closest_point_vw(dot(ab, ap), dot(ac, ap), dot(ab, ab),
+                             dot(ab, ac), dot(ac, ac), xp)
+
+    return xp.stack([1 - v - w, v, w], axis=-1)
+
+
+def _closest_point_vw(d1, d2, ab_ab, ab_ac, ac_ac, xp=np):
+    """Weights `v`, `w` of corners `b`, `c` of closest point on triangle.
+
+    Classifies the point into the Voronoi regions of vertices, edges and face
+    of the triangle, following Ericson, Real-Time Collision Detection, 5.1.5.
+    Dot products of the point with the triangle are derived from `d1 = ab.ap`
+    and `d2 = ac.ap`. All denominators are replaced by 1 where zero, so that
+    degenerate triangles give finite values and gradients.
+    """
+    where = tf.where if xp is tf else np.where
+
+    def safe(denom):
+        return where(denom == 0, xp.ones_like(denom), denom)
+
+    d3, d4 = d1 - ab_ab, d2 - ab_ac  # ab.bp, ac.bp
+    d5, d6 = d1 - ab_ac, d2 - ac_ac  # ab.cp, ac.cp
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    zero, one = xp.zeros_like(d1), xp.ones_like(d1)
+
+    # face region, overwritten by edge and vertex regions in reverse order
+    # of precedence
+    denom = safe(va + vb + vc)
+    v, w = vb / denom, vc / denom
+
+    # edge bc
+    t = (d4 - d3) / safe((d4 - d3) + (d5 - d6))
+    mask = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+    v, w = where(mask, one - t, v), where(mask, t, w)
+
+    # edge ac
+    t = d2 / safe(d2 - d6)
+    mask = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+    v, w = where(mask, zero, v), where(mask, t, w)
+
+    # vertex c
+    mask = (d6 >= 0) & (d5 <= d6)
+    v, w = where(mask, zero, v), where(mask, one, w)
+
+    # edge ab
+    t = d1 / safe(d1 - d3)
+    mask = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+    v, w = where(mask, t, v), where(mask, zero, w)
+
+    # vertex b
+    mask = (d3 >= 0) & (d4 <= d3)
+    v, w = where(mask, one, v), where(mask, zero, w)
+
+    # vertex a
+    mask = (d1 <= 0) & (d2 <= 0)
+    v, w = where(mask, zero, v), where(mask, zero, w)
+
+    return v, w
+
+
+def weights_to_coords(weights):
+    """Converts barycentric weights (u, v, w) of corners to coordinates
+    (r1, r2) of `dense_sample`, where `sqrt(r1) = 1 - u` and
+    `r2 = w / (1 - u)`.
+    """
+    sqrt_r1 = weights[:, 1] + weights[:, 2]
+    r2 = np.divide(weights[:, 2], sqrt_r1,
+                   out=np.zeros_like(sqrt_r1), where=sqrt_r1 > 0)
+
+    return np.stack([sqrt_r1**2, np.clip(r2, 0, 1)], axis=-1)
+
+
+def _dot_np(x, y):
+    return np.sum(x * y, axis=-1)
+
+
+def _dot_tf(x, y):
+    return tf.reduce_sum(x * y, axis=-1)
+
+
+@profile
+def point_mesh_distance_tf(points, verts, triangles, ids_triangle):
+    """Differentiable distance of points to given triangles of mesh.
+
+    Closest triangles are found without gradients, e.g. by
+    `PointMeshDistance.query`. Distances are then exact and differentiable
+    with respect to `points` and `verts`.
+
+    Arguments
+    ---------
+    points : tf.Tensor of shape (n_points, 3)
+        Query coordinates.
+
+    verts : tf.Tensor of shape (n_verts, 3)
+        Position of mesh vertices.
+
+    triangles : tf.Tensor of shape (n_triangles, 3)
+        Indices of vertices that make up the triangle.
+
+    ids_triangle : tf.Tensor of shape (n_points,)
+        Index of closest triangle for each point.
+
+    Returns
+    -------
+    dists : tf.Tensor of shape (n_points,)
+        Euclidean distance of each point to its triangle.
+    """
+    points = tf.convert_to_tensor(points)
+    verts = tf.cast(verts, points.dtype)
+
+    corners = tf.gather(triangles, ids_triangle)
+    a = tf.gather(verts, corners[:, 0])
+    b = tf.gather(verts, corners[:, 1])
+    c = tf.gather(verts, corners[:, 2])
+
+    weights = closest_point_weights(points, a, b, c, xp=tf)
+    closest = weights[:, 0:1] * a + weights[:, 1:2] * b + weights[:, 2:3] * c
+    dists_sq = tf.reduce_sum((points - closest)**2, axis=-1)
+
+    # gradient of sqrt is infinite at 0
+    is_zero = dists_sq <= 0
+    dists = tf.sqrt(tf.where(is_zero, tf.ones_like(dists_sq), dists_sq))
+
+    return tf.where(is_zero, tf.zeros_like(dists), dists)
+
+
+# compiled version, traced once per dtype for any mesh and point count
+point_mesh_distance_tf_compiled = CompiledFunction(point_mesh_distance_tf, [
+    ([None, 3], FOLLOW), ([None, 3], FOLLOW),
+    ([None, 3], tf.int32), ([None], tf.int32),
+])
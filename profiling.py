@@ -0,0 +1,174 @@
+"""Opt-in timing instrumentation.
+
+Functions decorated with `profile` and blocks wrapped in `timer` record call
+counts, wall time histograms and bytes of array arguments once `enable` is
+called. While disabled, the only overhead is a flag check per call.
+
+Note: inside `tf.function` the Python body only runs while tracing, so only
+traces are recorded there.
+"""
+import bisect
+import functools
+import math
+import time
+from contextlib import contextmanager
+
+# upper edges of wall time histogram buckets in seconds, 1us to 100s
+BUCKET_EDGES = [10.0 ** e for e in range(-6, 3)]
+
+_enabled = False
+_records = {}
+
+
+class _Record:
+    __slots__ = ("count", "total", "min", "max", "nbytes", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.nbytes = 0
+        self.histogram = [0] * (len(BUCKET_EDGES) + 1)
+
+    def add(self, elapsed, nbytes):
+        self.count += 1
+        self.total += elapsed
+        self.min = min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+        self.nbytes += nbytes
+        self.histogram[bisect.bisect_left(BUCKET_EDGES, elapsed)] += 1
+
+
+def enable():
+    """Starts recording."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stops recording. Recorded stats are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Clears all recorded stats."""
+    _records.clear()
+
+
+def record(name, elapsed, nbytes=0):
+    """Adds one call of `name` taking `elapsed` seconds."""
+    rec = _records.get(name)
+    if rec is None:
+        rec = _records[name] = _Record()
+    rec.add(elapsed, nbytes)
+
+
+def _nbytes(obj):
+    """Returns size in bytes of numpy array or tensor, else 0."""
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    dtype = getattr(obj, "dtype", None)
+    shape = getattr(obj, "shape", None)
+    try:
+        return math.prod(shape) * dtype.size
+    except (TypeError, AttributeError):
+        return 0
+
+
+@contextmanager
+def timer(name, nbytes=0):
+    """Records wall time of enclosed block under `name`."""
+    if not _enabled:
+        yield
+        return
+
+    time_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - time_start, nbytes)
+
+
+def profile(fn=None, *, name=None):
+    """Decorator recording each call of `fn` while profiling is enabled.
+
+    Bytes processed are summed over array and tensor arguments.
+
+    Arguments
+    ---------
+    fn : callable
+        Function to profile.
+
+    name : string
+        Name under which calls are recorded. Defaults to module and
+        qualified name of `fn`.
+    """
+    if fn is None:
+        return functools.partial(profile, name=name)
+
+    if name is None:
+        module = fn.__module__.replace("common_utilities.", "", 1)
+        name = "{}.{}".format(module, fn.__qualname__)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+
+        nbytes = sum(_nbytes(arg) for arg in args) \
+            + sum(_nbytes(arg) for arg in kwargs.values())
+        time_start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - time_start, nbytes)
+
+    return wrapper
+
+
+def summary():
+    """Returns recorded stats.
+
+    Returns
+    -------
+    stats : dict
+        Maps name to dict with `count`, `total`, `mean`, `min`, `max` (in
+        seconds), `nbytes` and `histogram` (counts per `BUCKET_EDGES`
+        bucket, last bucket is overflow).
+    """
+    return {
+        name: {
+            "count": r.count,
+            "total": r.total,
+            "mean": r.total / r.count,
+            "min": r.min,
+            "max": r.max,
+            "nbytes": r.nbytes,
+            "histogram": list(r.histogram),
+        }
+        for name, r in _records.items()
+    }
+
+
+def report():
+    """Returns recorded stats as table sorted by total time."""
+    header = "{:<50} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+        "name", "calls", "total (s)", "mean (ms)", "max (ms)", "MB")
+    lines = [header, "-" * len(header)]
+    stats = sorted(summary().items(), key=lambda item: -item[1]["total"])
+    for name, s in stats:
+        lines.append(
+            "{:<50} {:>8d} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.1f}".format(
+                name, s["count"], s["total"], 1e3 * s["mean"],
+                1e3 * s["max"], s["nbytes"] / 2**20)
+        )
+
+    return "\n".join(lines)
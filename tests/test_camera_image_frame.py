@@ -0,0 +1,69 @@
+import numpy as np
+import tensorflow as tf
+from common_utilities.camera_image_frame import depth_to_xyz, xyz_to_uvd, \
+    uvd_to_xyz, depth_to_xyz_compiled
+
+# VGA camera with millimetre depths, as in the depth benchmarks
+CAM = np.array([475., 475., 319.5, 239.5])
+# float16 has 11 significant bits, a few roundings per coordinate
+RTOL_FLOAT16 = 3e-3
+
+
+def _depth(batch_size=2, height=480, width=640):
+    rng = np.random.RandomState(0)
+    return rng.uniform(100, 1000, [batch_size, height, width])
+
+
+def test_depth_to_xyz_float16_matches_float64():
+    depth = _depth()
+    xyz_ref = depth_to_xyz(depth, CAM).numpy()
+    xyz = depth_to_xyz(depth, CAM, dtype=tf.float16)
+
+    assert xyz.dtype == tf.float16
+    xyz = xyz.numpy().astype(np.float64)
+    assert np.all(np.isfinite(xyz))
+    np.testing.assert_allclose(xyz, xyz_ref, rtol=RTOL_FLOAT16, atol=0.5)
+
+
+def test_uvd_to_xyz_float16_does_not_overflow():
+    # (u - cx) * d alone exceeds float16 max of 65504
+    uvd = np.array([[639., 479., 1000.], [0., 0., 1000.]])
+    xyz_ref = uvd_to_xyz(uvd, CAM).numpy()
+    xyz = uvd_to_xyz(tf.constant(uvd, tf.float16), CAM).numpy()
+
+    assert np.all(np.isfinite(xyz))
+    np.testing.assert_allclose(xyz, xyz_ref, rtol=RTOL_FLOAT16)
+
+
+def test_xyz_to_uvd_float16_matches_float64():
+    xyz = depth_to_xyz(_depth(), CAM).numpy()
+    uvd_ref = xyz_to_uvd(xyz, CAM).numpy()
+    uvd = xyz_to_uvd(tf.constant(xyz, tf.float16), CAM)
+
+    assert uvd.dtype == tf.float16
+    uvd = uvd.numpy().astype(np.float64)
+    assert np.all(np.isfinite(uvd))
+    # pixel coordinates below 1024 have a float16 spacing of at most 0.5
+    np.testing.assert_allclose(uvd[..., :2], uvd_ref[..., :2], atol=1.)
+    np.testing.assert_allclose(uvd[..., 2], uvd_ref[..., 2],
+                               rtol=RTOL_FLOAT16)
+
+
+def test_round_trip_float64():
+    depth = _depth(batch_size=1, height=48, width=64)
+    uvd = xyz_to_uvd(depth_to_xyz(depth, CAM), CAM).numpy()
+
+    np.testing.assert_allclose(uvd[0, :, 2], depth.reshape(-1))
+    np.testing.assert_allclose(uvd[0, 1, :2], [1., 0.], atol=1e-9)
+
+
+def test_depth_to_xyz_compiled_follows_dtype():
+    depth = _depth(batch_size=1)
+    xyz_ref = depth_to_xyz(depth, CAM).numpy()
+    for dtype, rtol in [(tf.float64, 1e-12), (tf.float32, 1e-6),
+                        (tf.float16, RTOL_FLOAT16)]:
+        xyz = depth_to_xyz_compiled(tf.cast(depth, dtype), CAM)
+
+        assert xyz.dtype == dtype
+        np.testing.assert_allclose(xyz.numpy().astype(np.float64), xyz_ref,
+                                   rtol=rtol, atol=0.5 if rtol > 1e-4 else 0)
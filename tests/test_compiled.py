@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from common_utilities.barycentric_mesh_sampling import dense_sample_compiled
+from common_utilities.camera_image_frame import depth_to_xyz_compiled
+from common_utilities.transformation.rotate import rotate_x_compiled
+
+DTYPES = [tf.float16, tf.float32, tf.float64]
+
+
+def _assert_single_trace(compiled, dtype):
+    # other tests may trace other dtypes of the same compiled function
+    assert compiled.trace_counts[(dtype, False)] == 1
+    assert all(count == 1 for count in compiled.trace_counts.values())
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_depth_to_xyz_traced_once_per_dtype(dtype):
+    cam = [475., 475., 320., 240.]
+    for shape in [(24, 32), (48, 64), (2, 24, 32), (5, 48, 64)]:
+        depth = tf.random.uniform(shape, 100, 1000, dtype=tf.float32)
+        xyz = depth_to_xyz_compiled(tf.cast(depth, dtype), cam)
+        assert xyz.dtype == dtype
+        assert xyz.shape == (*shape[:-2], shape[-2] * shape[-1], 3)
+
+    _assert_single_trace(depth_to_xyz_compiled, dtype)
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_rotate_x_traced_once_per_dtype(dtype):
+    for n_points in [1, 10, 1000]:
+        points = tf.random.uniform([n_points, 3], dtype=dtype)
+        points_rot = rotate_x_compiled(points, np.pi / 3)
+        assert points_rot.dtype == dtype
+        assert points_rot.shape == (n_points, 3)
+
+    _assert_single_trace(rotate_x_compiled, dtype)
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_dense_sample_traced_once_per_dtype(dtype):
+    rng = np.random.RandomState(0)
+    for n_verts, n_samples in [(10, 5), (100, 1000), (1000, 20)]:
+        verts = tf.constant(rng.rand(n_verts, 3), dtype)
+        triangles = rng.randint(0, n_verts, [2 * n_verts, 3])
+        coords = rng.rand(n_samples, 2)
+        ids_triangle = rng.randint(0, 2 * n_verts, n_samples)
+
+        samples = dense_sample_compiled(verts, triangles, coords,
+                                        ids_triangle)
+        assert samples.dtype == dtype
+        assert samples.shape == (n_samples, 3)
+
+    _assert_single_trace(dense_sample_compiled, dtype)
@@ -0,0 +1,35 @@
+import os
+import shutil
+from common_utilities.directory import DirectoryManager, create_dir
+
+
+def test_create_dir_recreates_dir_removed_externally(tmp_path):
+    path = str(tmp_path / "a" / "b")
+    assert create_dir(path, False)
+    assert not create_dir(path, False)
+
+    shutil.rmtree(str(tmp_path / "a"))
+    assert create_dir(path, False)
+    assert os.path.isdir(path)
+
+
+def test_create_dir_deletes_existing(tmp_path):
+    path = str(tmp_path / "run")
+    create_dir(path, False)
+    open(os.path.join(path, "file"), "w").close()
+
+    assert create_dir(path, True)
+    assert os.listdir(path) == []
+
+
+def test_manager_caches_and_deletes(tmp_path):
+    manager = DirectoryManager()
+    root = str(tmp_path / "root")
+    paths = manager.create_tree(root, ["ckpt/best", "logs"])
+    assert all(os.path.isdir(path) for path in paths)
+    assert manager.exists(paths[0])
+
+    assert manager.delete(root, block=True)
+    assert not os.path.exists(root)
+    assert os.listdir(str(tmp_path)) == []
+    assert not manager.delete(root)
@@ -0,0 +1,30 @@
+import numpy as np
+import tensorflow as tf
+from common_utilities.tf_proto.example_proto import bytes_feature, \
+    construct_proto, parse_proto
+
+
+def test_bytes_feature_accepts_string_tensor():
+    feature = bytes_feature(tf.constant(b"abc"))
+    assert feature.bytes_list.value == [b"abc"]
+
+
+def test_construct_and_parse_proto_round_trip():
+    tensors = [
+        np.random.rand(5, 3).astype(np.float32),
+        np.arange(4, dtype=np.int64),
+        tf.constant(2.5, tf.float64),
+    ]
+    keys = ["pts", "ids", "scale"]
+    dtypes = [tf.float32, tf.int64, tf.float64]
+
+    proto = construct_proto(tensors, keys)
+    feature_description = {
+        key: tf.io.FixedLenFeature([], tf.string) for key in keys}
+    example = parse_proto(proto.SerializeToString(), feature_description,
+                          dtypes)
+
+    assert list(example) == keys
+    for key, tensor, dtype in zip(keys, tensors, dtypes):
+        assert example[key].dtype == dtype
+        np.testing.assert_array_equal(example[key].numpy(), tensor)
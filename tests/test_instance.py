@@ -0,0 +1,55 @@
+import numpy as np
+import tensorflow as tf
+from common_utilities.instance import tf2np, make_list
+
+
+def test_tf2np_keeps_nested_structure():
+    data = {
+        "pts": tf.ones([4, 3]),
+        "pair": (tf.zeros([2], tf.int32), np.arange(3)),
+        "names": ["a", tf.constant([1.5, 2.5])],
+    }
+    out = tf2np(data)
+
+    assert set(out) == {"pts", "pair", "names"}
+    assert isinstance(out["pair"], tuple) and isinstance(out["names"], list)
+    np.testing.assert_array_equal(out["pts"], np.ones([4, 3]))
+    assert out["pts"].dtype == np.float32
+    assert out["pair"][0].dtype == np.int32
+    assert out["pair"][1] is data["pair"][1]
+    assert out["names"][0] == "a"
+    np.testing.assert_array_equal(out["names"][1], [1.5, 2.5])
+
+
+def test_tf2np_returns_views_of_host_tensors():
+    tensor = tf.random.uniform([100, 3])
+    assert np.shares_memory(tf2np(tensor), tf2np(tensor))
+    assert np.shares_memory(tf2np([tensor])[0], tf2np(tensor))
+
+
+def test_tf2np_scalars_match_numpy():
+    for tensor in [tf.constant(1.5), tf.constant(3, tf.int64)]:
+        for out in [tf2np(tensor), tf2np((tensor,))[0]]:
+            assert type(out) is type(tensor.numpy())
+            assert out == tensor.numpy()
+
+
+def test_tf2np_strings_match_numpy():
+    scalar = tf.constant(b"abc")
+    vector = tf.constant([b"a", b"bc"])
+
+    assert tf2np(scalar) == b"abc" and isinstance(tf2np(scalar), bytes)
+    assert tf2np({"s": scalar})["s"] == b"abc"
+    assert list(tf2np(vector)) == [b"a", b"bc"]
+
+
+def test_tf2np_passes_through_non_tensors():
+    array = np.zeros(3)
+    assert tf2np(array) is array
+    assert tf2np(None) is None
+
+
+def test_make_list():
+    assert make_list(1) == [1]
+    assert make_list((1, 2)) == [1, 2]
+    assert make_list([1]) == [1]
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from common_utilities.barycentric_mesh_sampling import dense_sample
+from common_utilities.point_mesh_distance import PointMeshDistance, \
+    closest_point_weights, point_mesh_distance_tf
+
+
+def _brute_force(verts, triangles, points):
+    """Returns distance to closest triangle comparing every pair."""
+    a, b, c = (verts[triangles[:, i]][np.newaxis] for i in range(3))
+    weights = closest_point_weights(points[:, np.newaxis], a, b, c)
+    closest = weights[..., 0:1] * a + weights[..., 1:2] * b \
+        + weights[..., 2:3] * c
+
+    return np.min(np.linalg.norm(points[:, np.newaxis] - closest, axis=-1),
+                  axis=1)
+
+
+def _random_mesh(rng, n_verts=300, n_triangles=400):
+    verts = rng.uniform(0, 100, [n_verts, 3])
+    triangles = rng.randint(0, n_verts, [n_triangles, 3])
+    # degenerate triangles: repeated vertex and collinear vertices
+    triangles[:10, 1] = triangles[:10, 0]
+    verts[-3:] = [[0, 0, 0], [1, 1, 1], [2, 2, 2]]
+    triangles[10] = [n_verts - 3, n_verts - 2, n_verts - 1]
+    # one large triangle around everything
+    verts = np.concatenate([verts, [[-1e3, -1e3, 50], [1e3, -1e3, 50],
+                                    [0, 1e3, 50]]])
+    triangles = np.concatenate(
+        [triangles, [[n_verts, n_verts + 1, n_verts + 2]]])
+
+    return verts, triangles
+
+
+@pytest.mark.parametrize("max_pairs", [7, 2**20])
+@pytest.mark.parametrize("k", [1, 8])
+def test_query_matches_brute_force(max_pairs, k):
+    rng = np.random.RandomState(0)
+    verts, triangles = _random_mesh(rng)
+    points = rng.uniform(-20, 120, [500, 3])
+
+    dists, ids_triangle, coords = PointMeshDistance(verts, triangles).query(
+        points, k=k, max_pairs=max_pairs)
+
+    np.testing.assert_allclose(dists, _brute_force(verts, triangles, points),
+                               rtol=1e-9, atol=1e-9)
+
+    # coords rebuild the closest point on the returned triangle
+    closest = dense_sample(verts, triangles, coords, ids_triangle).numpy()
+    np.testing.assert_allclose(np.linalg.norm(closest - points, axis=-1),
+                               dists, rtol=1e-7, atol=1e-7)
+
+
+def test_query_float32_and_update():
+    rng = np.random.RandomState(1)
+    verts, triangles = _random_mesh(rng)
+    points = rng.uniform(-20, 120, [200, 3])
+    engine = PointMeshDistance(verts.astype(np.float32), triangles)
+
+    dists, _, coords = engine.query(points.astype(np.float32))
+    assert dists.dtype == np.float32 and coords.dtype == np.float32
+    np.testing.assert_allclose(dists, _brute_force(verts, triangles, points),
+                               rtol=1e-4, atol=1e-3)
+
+    verts_moved = verts + [5., 0., 0.]
+    engine.update(verts_moved)
+    np.testing.assert_allclose(
+        engine.query(points)[0],
+        _brute_force(verts_moved, triangles, points), rtol=1e-4, atol=1e-3)
+
+
+def test_tf_distance_matches_query_with_finite_gradients():
+    rng = np.random.RandomState(2)
+    verts, triangles = _random_mesh(rng, n_verts=50, n_triangles=60)
+    points = rng.uniform(0, 100, [100, 3])
+    # points on the surface have zero distance, sqrt has no gradient there
+    points[:20] = verts[triangles[20:40, 0]]
+
+    dists, ids_triangle, _ = PointMeshDistance(verts, triangles).query(points)
+
+    points_tf = tf.constant(points)
+    verts_tf = tf.constant(verts)
+    with tf.GradientTape() as tape:
+        tape.watch([points_tf, verts_tf])
+        dists_tf = point_mesh_distance_tf(points_tf, verts_tf, triangles,
+                                          ids_triangle)
+        loss = tf.reduce_sum(dists_tf)
+    grad_points, grad_verts = tape.gradient(loss, [points_tf, verts_tf])
+
+    np.testing.assert_allclose(dists_tf.numpy(), dists, atol=1e-9)
+    np.testing.assert_allclose(dists[:20], 0, atol=1e-9)
+    assert np.all(np.isfinite(grad_points.numpy()))
+    assert np.all(np.isfinite(tf.convert_to_tensor(grad_verts).numpy()))
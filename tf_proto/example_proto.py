@@ -1,14 +1,16 @@
 import tensorflow as tf
+from common_utilities.instance import tf2np
+from common_utilities.profiling import profile
 
 
 def bytes_feature(value):
     """Returns a bytes_list from a string / byte."""
     # BytesList won't unpack string from EagerTensor
-    if isinstance(value, tf.Tensor):
-        value = value.numpy()
+    value = tf2np(value)
     return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
 
 
+@profile
 def construct_proto(tensors: list, keys: list):
     """Convert data to proto string for storing as tfrecord."""
     feature = {}
@@ -19,6 +21,7 @@ def construct_proto(tensors: list, keys: list):
     return proto
 
 
+@profile
 def parse_proto(proto, feature_description, dtypes):
     """Parses proto into data."""
     parsed = tf.io.parse_single_example(proto, feature_description)
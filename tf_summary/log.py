@@ -1,7 +1,10 @@
 import tensorflow as tf
 from common_utilities.instance import make_list
+from common_utilities import profiling
+from common_utilities.profiling import profile
 
 
+@profile
 def log_summary(writer, epoch,
                 scalars=None, str_scalars=None,
                 images=None, str_images=None):
@@ -25,3 +28,22 @@ def log_summary(writer, epoch,
                 tf.summary.image(str_image, image, step=epoch)
 
     return
+
+
+def log_profile(writer, epoch, prefix="profile"):
+    """Writes stats recorded by `common_utilities.profiling` as scalars."""
+    stats = profiling.summary()
+    if not stats:
+        return
+
+    scalars, str_scalars = [], []
+    for name, s in stats.items():
+        scalars += [s["count"], s["total"], 1e3 * s["mean"],
+                    1e3 * s["max"], s["nbytes"] / 2**20]
+        str_scalars += [
+            "{}/{}/{}".format(prefix, name, key)
+            for key in ["calls", "total_s", "mean_ms", "max_ms", "MB"]
+        ]
+    log_summary(writer, epoch, scalars=scalars, str_scalars=str_scalars)
+
+    return
@@ -1,7 +1,9 @@
 import tensorflow as tf
 from tensorflow_graphics.geometry import transformation
+from common_utilities.profiling import profile
 
 
+@profile
 def axis_angle2rot_mat(axis_angle):
     """Converts axis angle representation to rotation matrix.
 
@@ -25,6 +27,7 @@ def axis_angle2rot_mat(axis_angle):
     return mat_rot
 
 
+@profile
 def rot_mat2axis_angle(rot_mat):
     """Converts rotation matrix to axis angle representation.
 
@@ -2,6 +2,13 @@ import tensorflow as tf
 import numpy as np
 
 
+def _cos_sin_zero_one(angle):
+    """Returns entries of rotation matrix in dtype of `angle`."""
+    angle = tf.convert_to_tensor(angle)
+    return tf.cos(angle), tf.sin(angle), \
+        tf.zeros_like(angle), tf.ones_like(angle)
+
+
 def rot_mat_x(angle):
     """Returns 3x3 rotation matrix about X axis.
 
@@ -12,12 +19,13 @@ def rot_mat_x(angle):
 
     Returns
     -------
-    rot_mat : tf.Tensor of shape (3, 3)
+    rot_mat : tf.Tensor of shape (3, 3); same dtype as `angle`
         Rotation matrix corresponding to angle about X axis.
     """
-    row1 = tf.stack([1., 0,             0])
-    row2 = tf.stack([0,  tf.cos(angle), -tf.sin(angle)])
-    row3 = tf.stack([0,  tf.sin(angle), tf.cos(angle)])
+    cos, sin, zero, one = _cos_sin_zero_one(angle)
+    row1 = tf.stack([one,  zero, zero])
+    row2 = tf.stack([zero, cos,  -sin])
+    row3 = tf.stack([zero, sin,  cos])
     rot_mat = tf.stack([row1, row2, row3], axis=0)
 
     return rot_mat
@@ -33,12 +41,13 @@ def rot_mat_y(angle):
 
     Returns
     -------
-    rot_mat : tf.Tensor of shape (3, 3)
+    rot_mat : tf.Tensor of shape (3, 3); same dtype as `angle`
         Rotation matrix corresponding to angle about Y axis.
     """
-    row1 = tf.stack([tf.cos(angle), 0, tf.sin(angle)])
-    row2 = tf.stack([0.,            1, 0])
-    row3 = tf.stack([-tf.sin(angle), 0, tf.cos(angle)])
+    cos, sin, zero, one = _cos_sin_zero_one(angle)
+    row1 = tf.stack([cos,  zero, sin])
+    row2 = tf.stack([zero, one,  zero])
+    row3 = tf.stack([-sin, zero, cos])
     rot_mat = tf.stack([row1, row2, row3], axis=0)
 
     return rot_mat
@@ -54,12 +63,13 @@ def rot_mat_z(angle):
 
     Returns
     -------
-    rot_mat : tf.Tensor of shape (3, 3)
+    rot_mat : tf.Tensor of shape (3, 3); same dtype as `angle`
         Rotation matrix corresponding to angle about Z axis.
     """
-    row1 = tf.stack([tf.cos(angle), -tf.sin(angle), 0])
-    row2 = tf.stack([tf.sin(angle), tf.cos(angle),  0])
-    row3 = tf.stack([0.,             0,             1])
+    cos, sin, zero, one = _cos_sin_zero_one(angle)
+    row1 = tf.stack([cos,  -sin, zero])
+    row2 = tf.stack([sin,  cos,  zero])
+    row3 = tf.stack([zero, zero, one])
     rot_mat = tf.stack([row1, row2, row3], axis=0)
 
     return rot_mat
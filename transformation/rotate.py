@@ -1,7 +1,10 @@
 import tensorflow as tf
+from common_utilities.compiled import FOLLOW, CompiledFunction
 from .rot_mat import rot_mat_x, rot_mat_y, rot_mat_z
+from common_utilities.profiling import profile
 
 
+@profile
 def rotate_x(points, angle):
     """Rotates `points` about x axis by `angle`.
 
@@ -16,14 +19,16 @@ def rotate_x(points, angle):
     Returns
     -------
     points_rot : tf.Tensor of shape (n, 3)
-        3D position of rotated points.
+        3D position of rotated points. dtype is same as `points`.
     """
-    rot_mat = rot_mat_x(angle)
+    points = tf.convert_to_tensor(points)
+    rot_mat = rot_mat_x(tf.cast(angle, points.dtype))
     points_rot = tf.tensordot(points, rot_mat, axes=[[1], [1]])
 
     return points_rot
 
 
+@profile
 def rotate_y(points, angle):
     """Rotates `points` about y axis by `angle`.
 
@@ -38,14 +43,16 @@ def rotate_y(points, angle):
     Returns
     -------
     points_rot : tf.Tensor of shape (n, 3)
-        3D position of rotated points.
+        3D position of rotated points. dtype is same as `points`.
     """
-    rot_mat = rot_mat_y(angle)
+    points = tf.convert_to_tensor(points)
+    rot_mat = rot_mat_y(tf.cast(angle, points.dtype))
     points_rot = tf.tensordot(points, rot_mat, axes=[[1], [1]])
 
     return points_rot
 
 
+@profile
 def rotate_z(points, angle):
     """Rotates `points` about z axis by `angle`.
 
@@ -60,9 +67,17 @@ def rotate_z(points, angle):
     Returns
     -------
     points_rot : tf.Tensor of shape (n, 3)
-        3D position of rotated points.
+        3D position of rotated points. dtype is same as `points`.
     """
-    rot_mat = rot_mat_z(angle)
+    points = tf.convert_to_tensor(points)
+    rot_mat = rot_mat_z(tf.cast(angle, points.dtype))
     points_rot = tf.tensordot(points, rot_mat, axes=[[1], [1]])
 
     return points_rot
+
+
+# compiled versions, traced once per dtype for any number of points
+_ROTATE_SPECS = [([None, 3], FOLLOW), ([], FOLLOW)]
+rotate_x_compiled = CompiledFunction(rotate_x, _ROTATE_SPECS)
+rotate_y_compiled = CompiledFunction(rotate_y, _ROTATE_SPECS)
+rotate_z_compiled = CompiledFunction(rotate_z, _ROTATE_SPECS)